@@ -0,0 +1,64 @@
+import argparse
+import time
+
+from online_scrabble.benchmark.positions import load_positions
+from online_scrabble.core import load_gaddag, load_lexicon, SolutionBuilder
+
+
+def move_set(placements) -> set:
+    return {(i.x, i.y, i.horizontal, tuple(map(str, i.letters))) for i in placements}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the Appel-Jacobson and GADDAG move generators."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="solves per engine and position, of which the fastest is kept",
+    )
+    args = parser.parse_args()
+
+    lexicon = load_lexicon()
+    gaddag = load_gaddag()
+
+    totals = {"dawg": 0.0, "gaddag": 0.0}
+
+    print(
+        f"{'position':<16} {'moves':>6} {'dawg (s)':>9} {'gaddag (s)':>11} "
+        f"{'speedup':>8}"
+    )
+
+    for position in load_positions():
+        grid, rack = position.grid, position.rack
+        placements = {}
+        times = {}
+
+        for name, engine in (("dawg", None), ("gaddag", gaddag)):
+            solution_builder = SolutionBuilder(grid, lexicon, engine)
+            times[name] = float("inf")
+
+            # The first solve also fills the lexicons' caches of children, as
+            # a long-running server would have long since done.
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                placements[name] = solution_builder.solve(rack)
+                times[name] = min(times[name], time.perf_counter() - start)
+
+            totals[name] += times[name]
+
+        if move_set(placements["dawg"]) != move_set(placements["gaddag"]):
+            raise AssertionError(f"The engines disagree on {position.name}.")
+
+        print(
+            f"{position.name:<16} {len(placements['dawg']):>6} {times['dawg']:>9.3f} "
+            f"{times['gaddag']:>11.3f} {times['dawg'] / times['gaddag']:>7.2f}x"
+        )
+
+    print(f"speedup: {totals['dawg'] / totals['gaddag']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+from online_scrabble.core import Dawg, Trie
+
+
+def measure_load(load: Callable, path: str):
+    gc.collect()
+    start = time.perf_counter()
+    lexicon = load(path)
+    elapsed = time.perf_counter() - start
+    del lexicon
+
+    # Tracing slows loading down, so memory is measured on a second load.
+    gc.collect()
+    tracemalloc.start()
+    lexicon = load(path)
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return lexicon, elapsed, retained
+
+
+def measure_lookups(lexicon, words: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            lexicon.contains(word)
+    return (time.perf_counter() - start) / (repeat * len(words))
+
+
+def sample_words(path: str, count: int, seed: int) -> List[str]:
+    with open(path, encoding="utf-8") as dictionary:
+        words = [i.rstrip("\n") for i in dictionary]
+
+    rng = random.Random(seed)
+    present = rng.sample(words, count // 2)
+    # Swapping two letters mostly produces misses that share a long prefix
+    # with a real word, which is the expensive case for a lookup.
+    absent = []
+    for word in rng.sample(words, count - len(present)):
+        index = rng.randrange(len(word) - 1)
+        absent.append(word[:index] + word[index + 1] + word[index] + word[index + 2 :])
+
+    return present + absent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare Trie and Dawg lexicons.")
+    parser.add_argument("--dictionary", default="dictionary.txt")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    words = sample_words(args.dictionary, args.lookups, args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        compiled = os.path.join(directory, "dictionary.dawg")
+        Dawg.load(args.dictionary).save(compiled)
+
+        candidates = (
+            ("Trie", Trie.load, args.dictionary),
+            ("Dawg", Dawg.load, args.dictionary),
+            ("Mapped", Dawg.open, compiled),
+        )
+
+        print(
+            f"{'lexicon':<8} {'load (s)':>10} {'memory (MB)':>12} {'lookup (us)':>12}"
+        )
+
+        for name, load, path in candidates:
+            lexicon, elapsed, retained = measure_load(load, path)
+            lookup = measure_lookups(lexicon, words, args.repeat)
+            print(
+                f"{name:<8} {elapsed:>10.4f} {retained / 2**20:>12.1f} "
+                f"{lookup * 1e6:>12.2f}"
+            )
+            del lexicon
+
+
+if __name__ == "__main__":
+    main()
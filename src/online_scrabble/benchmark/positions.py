@@ -0,0 +1,47 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import List
+
+from online_scrabble.core import Character, Grid, Placement
+
+POSITIONS_PATH = os.path.join(os.path.dirname(__file__), "positions.json")
+
+
+@dataclass
+class Position:
+    name: str
+    grid: Grid
+    rack: str
+
+
+def parse_move(move: str) -> Placement:
+    """Read a move such as "7 7 across MONkEY".
+
+    The coordinates are those of the first new tile and the letters are the
+    new tiles only; lower case letters are blanks.
+    """
+    x, y, direction, letters = move.split()
+
+    return Placement(
+        int(x),
+        int(y),
+        direction == "across",
+        [Character(i.upper(), i.islower()) for i in letters],
+    )
+
+
+def load_positions(path: str = POSITIONS_PATH) -> List[Position]:
+    """The canned benchmark boards, each with the rack to move."""
+    with open(path, encoding="utf-8") as source:
+        positions = json.load(source)
+
+    result = []
+
+    for position in positions:
+        grid = Grid.large()
+        for move in position["moves"]:
+            grid.insert(parse_move(move))
+        result += [Position(position["name"], grid, position["rack"])]
+
+    return result
@@ -0,0 +1,226 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from online_scrabble.benchmark.lexicon import sample_words
+from online_scrabble.benchmark.positions import load_positions, Position
+from online_scrabble.core import (
+    Dawg,
+    load_gaddag,
+    load_lexicon,
+    SolutionBuilder,
+    Trie,
+)
+from online_scrabble.core.anchor import calculate_anchors
+
+
+# Seconds one run of a benchmark should take at least, so that short calls
+# are not lost in the timer's resolution and the scheduler's noise.
+MIN_TIME = 0.2
+
+# Benchmarks by name, each a function and how many items one call handles.
+Benchmarks = Dict[str, Tuple[Callable, int]]
+
+
+def autorange(func: Callable) -> int:
+    """How many calls of `func` take at least MIN_TIME, as in `timeit`.
+
+    The calls made to find out also warm up any caches.
+    """
+    number = 1
+
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= MIN_TIME:
+            return number
+        number *= 2
+
+
+def measure(benchmarks: Benchmarks, repeat: int) -> Dict[str, dict]:
+    """Seconds per item of each benchmark, over `repeat` rounds.
+
+    Each round runs every benchmark once, rather than each benchmark
+    running `repeat` times in a row. A machine that slows down for a while
+    then shows up as spread in every benchmark, instead of making a few of
+    them look slower.
+    """
+    numbers = {name: autorange(func) for name, (func, _items) in benchmarks.items()}
+    times = {name: [] for name in benchmarks}
+
+    for _ in range(repeat):
+        for name, (func, items) in benchmarks.items():
+            number = numbers[name]
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times[name] += [(time.perf_counter() - start) / number / items]
+
+    return {
+        name: {
+            "min": min(times[name]),
+            "median": statistics.median(times[name]),
+            "max": max(times[name]),
+            "repeat": repeat,
+            "number": numbers[name],
+        }
+        for name in benchmarks
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def position_benchmarks(position: Position, lexicon, gaddag) -> Benchmarks:
+    benchmarks = {}
+    grid = position.grid
+    grid.prepare_cross_checks(lexicon)
+
+    def anchors():
+        # Forget the anchors kept on the grid so they are all recreated.
+        grid.anchor_lexicon = None
+        calculate_anchors(grid, lexicon)
+
+    benchmarks[f"calculate_anchors/{position.name}"] = (anchors, 1)
+
+    solution_builder = SolutionBuilder(grid, lexicon)
+    benchmarks[f"solve/{position.name}"] = (
+        lambda: solution_builder.solve(position.rack),
+        1,
+    )
+
+    if gaddag is not None:
+        gaddag_builder = SolutionBuilder(grid, lexicon, gaddag)
+        benchmarks[f"solve-gaddag/{position.name}"] = (
+            lambda: gaddag_builder.solve(position.rack),
+            1,
+        )
+
+    best = solution_builder.solve(position.rack, best_only=True)[-1]
+    scored_grid = grid.copy()
+    scored_grid.insert(best)
+
+    benchmarks[f"score/{position.name}"] = (
+        lambda: solution_builder.score(scored_grid, best.x, best.y, best.horizontal),
+        1,
+    )
+    benchmarks[f"grid.copy/{position.name}"] = (grid.copy, 1)
+
+    return benchmarks
+
+
+def run(args: argparse.Namespace) -> Dict[str, dict]:
+    words = sample_words(args.dictionary, args.lookups, 0)
+    trie = Trie.load(args.dictionary)
+    lexicon = load_lexicon(text_path=args.dictionary)
+    gaddag = load_gaddag(text_path=args.dictionary) if args.gaddag else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        binary_path = f"{directory}/dictionary.dawg"
+        lexicon.save(binary_path)
+
+        # `load_lexicon` builds the Dawg from the word list, or opens the
+        # compiled file when there is one; both are timed.
+        benchmarks = {
+            "trie.load": (lambda: Trie.load(args.dictionary), 1),
+            "trie.contains": (lambda: [trie.contains(i) for i in words], len(words)),
+            "dawg.load": (lambda: Dawg.load(args.dictionary), 1),
+            "dawg.open": (lambda: Dawg.open(binary_path), 1),
+            "dawg.contains": (
+                lambda: [lexicon.contains(i) for i in words],
+                len(words),
+            ),
+        }
+
+        for position in load_positions():
+            benchmarks.update(position_benchmarks(position, lexicon, gaddag))
+
+        return measure(benchmarks, args.repeat)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float):
+    """Print the benchmarks that got slower than `baseline` allows.
+
+    Medians are compared, and a benchmark only counts as slower when its
+    median moved by more than `tolerance` and by more than the spread
+    between the fastest and slowest runs of either side.
+    """
+    regressions = 0
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        before = baseline[name]
+        ratio = result["median"] / before["median"]
+        noise = max(
+            result["max"] - result["min"],
+            before.get("max", before["median"]) - before["min"],
+        )
+
+        if ratio > 1 + tolerance and result["median"] - before["median"] > noise:
+            regressions += 1
+            print(f"{name}: {ratio:.2f}x slower", file=sys.stderr)
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Time the core engine on the canned benchmark positions."
+    )
+    parser.add_argument("--dictionary", default="dictionary.txt")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--gaddag", action="store_true", help="Also time the GADDAG.")
+    parser.add_argument("--output", help="Write the results here, not to stdout.")
+    parser.add_argument("--compare", help="Results of an earlier run to compare to.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="How much slower than --compare a benchmark may get.",
+    )
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+        "results": run(args),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as source:
+            baseline = json.load(source)["results"]
+
+        if compare(report["results"], baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import argparse
+import asyncio
+import random
+import time
+from base64 import b64encode
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+from online_scrabble.bot.bot import (
+    BACKOFF,
+    HOST,
+    MAX_BACKOFF,
+    STREAM_TIMEOUT,
+    BotError,
+    GameState,
+)
+from online_scrabble.bot.stats import BotStats
+from online_scrabble.bot.strategy import MonteCarloStrategy
+from online_scrabble.core import (
+    Grid,
+    load_lexicon,
+    Placement,
+    ScoredPlacement,
+    SolveCache,
+)
+
+MAX_CONNECTIONS = 100
+
+
+class BotGame:
+    """What a bot knows about one of its games.
+
+    The game is started once `players` players have joined it.
+    """
+
+    def __init__(self, id: str, players: int = 2):
+        self.id = id
+        self.players = players
+
+        self.grid = None
+        self.rack = None
+        self.score = None
+        self.state = None
+        self.turn = None
+        self.number_of_players = None
+        self.version = None
+
+    def our_turn(self, name: str) -> bool:
+        return self.state is GameState.InProgress and self.turn == name
+
+    def load(self, game_json: dict, version: str):
+        self.state = GameState(game_json["state"])
+        self.grid = Grid.from_json(game_json["grid"])
+        self.turn = game_json["turn"]
+        self.number_of_players = len(game_json["players"])
+        self.version = version
+
+    def apply_events(self, events_json: dict):
+        for event in events_json["events"]:
+            if event["type"] == "join":
+                self.number_of_players += 1
+            elif event["type"] == "placement":
+                self.grid.insert(ScoredPlacement.from_json(event["placement"]))
+
+        self.state = GameState(events_json["state"])
+        self.turn = events_json["turn"]
+        self.version = events_json["version"]
+
+
+class AsyncScrabbleBot:
+    """Bot that plays any number of games at once from one event loop.
+
+    Requests share one pooled keep-alive session and moves are found in
+    `executor`, a single thread by default, so that solving never blocks
+    the loop. Use the bot with `async with`, or pass a `session` and an
+    `executor` that the caller closes. Bots may share a `solve_cache`, and
+    sharing the executor too keeps them to one solver thread. With `stats`
+    the bot records its moves, errors and latencies there, and with
+    `strategy` it chooses its moves with it rather than playing the highest
+    scoring one. `players` gives the number of players to wait for in each
+    game, two if a game is not in it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        host: str = HOST,
+        solve_cache: Optional[SolveCache] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        executor: Optional[Executor] = None,
+        stats: Optional[BotStats] = None,
+        strategy: Optional[MonteCarloStrategy] = None,
+        players: Optional[Dict[str, int]] = None,
+    ):
+        self.name = name
+        self.host = host
+        self.solve_cache = solve_cache or SolveCache(load_lexicon())
+        self.session = session
+        self.own_session = session is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.own_executor = executor is None
+        self.stats = stats
+        self.strategy = strategy
+        self.players = players or {}
+
+        self.games: Dict[str, BotGame] = {}
+
+    def get_game(self, game: str) -> BotGame:
+        if game not in self.games:
+            self.games[game] = BotGame(game, self.players.get(game, 2))
+
+        return self.games[game]
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+            )
+
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.own_session:
+            await self.session.close()
+            self.session = None
+
+        if self.own_executor:
+            self.executor.shutdown()
+
+    def get_headers(self) -> dict:
+        authorization = b64encode(f"{self.name}:".encode("utf-8")).decode("utf-8")
+
+        return {"Authorization": authorization}
+
+    async def request(
+        self, method: str, path: str, timed: bool = True, **kwargs
+    ) -> Tuple[aiohttp.ClientResponse, dict]:
+        start = time.perf_counter()
+
+        try:
+            async with self.session.request(
+                method, f"{self.host}{path}", headers=self.get_headers(), **kwargs
+            ) as response:
+                response_json = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise BotError(str(error) or type(error).__name__) from error
+
+        if self.stats is not None and timed:
+            self.stats.request_times.append(time.perf_counter() - start)
+
+        if response.status >= 400:
+            raise BotError(response_json.get("message", response.reason))
+
+        return response, response_json
+
+    async def create_game(self, game: str):
+        _response, response_json = await self.request("POST", f"/game/{game}")
+
+        if response_json["message"] != "Game created.":
+            raise BotError(response_json["message"])
+
+    async def join_game(self, game: str):
+        _response, response_json = await self.request("PUT", f"/game/{game}/join")
+
+        bot_game = self.get_game(game)
+        bot_game.rack = response_json["rack"]
+        bot_game.score = response_json["score"]
+
+    async def start_game(self, game: str):
+        await self.request("PUT", f"/game/{game}/start")
+
+    async def get_player_state(self, bot_game: BotGame):
+        _response, response_json = await self.request(
+            "PUT", f"/game/{bot_game.id}/player_state"
+        )
+
+        bot_game.rack = response_json["rack"]
+        bot_game.score = response_json["score"]
+
+    async def put_placement(self, bot_game: BotGame, placement: Placement):
+        _response, response_json = await self.request(
+            "PUT", f"/game/{bot_game.id}/placement", json=placement.json()
+        )
+
+        bot_game.rack = response_json["rack"]
+        bot_game.score = response_json["score"]
+
+    async def fetch_game(self, bot_game: BotGame):
+        response, response_json = await self.request("GET", f"/game/{bot_game.id}")
+        bot_game.load(response_json, response.headers["ETag"].strip('"'))
+
+    async def fetch_events(self, bot_game: BotGame, wait: bool = False):
+        """Bring the game up to date, with `wait` once something happens."""
+        if bot_game.version is None:
+            await self.fetch_game(bot_game)
+            return
+
+        try:
+            if wait:
+                _response, response_json = await self.request(
+                    "GET",
+                    f"/game/{bot_game.id}/stream",
+                    timed=False,
+                    params={"since": bot_game.version, "timeout": STREAM_TIMEOUT},
+                    timeout=aiohttp.ClientTimeout(total=STREAM_TIMEOUT + 10),
+                )
+            else:
+                _response, response_json = await self.request(
+                    "GET",
+                    f"/game/{bot_game.id}/events",
+                    params={"since": bot_game.version},
+                )
+        except BotError:
+            # The game may have been deleted and created again, so fetch
+            # all of it next time.
+            bot_game.version = None
+            raise
+
+        bot_game.apply_events(response_json)
+
+    def get_highest_scoring_move(
+        self, grid: Grid, rack: str
+    ) -> Optional[ScoredPlacement]:
+        placements = self.solve_cache.solve(grid, rack, top_k=1)
+
+        if len(placements) == 0:
+            return None
+
+        return placements[-1]
+
+    def choose_move(self, grid: Grid, rack: str) -> Optional[ScoredPlacement]:
+        if self.strategy is not None:
+            return self.strategy.choose(grid, rack)
+
+        return self.get_highest_scoring_move(grid, rack)
+
+    async def work(self, bot_game: BotGame):
+        if (
+            bot_game.turn is None
+            and type(bot_game.number_of_players) is int
+            and bot_game.number_of_players >= bot_game.players
+        ):
+            try:
+                await self.start_game(bot_game.id)
+            except BotError:
+                pass
+
+        await self.fetch_events(bot_game, wait=not bot_game.our_turn(self.name))
+
+        if bot_game.our_turn(self.name):
+            if bot_game.rack is None:
+                await self.get_player_state(bot_game)
+
+            start = time.perf_counter()
+            placement = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                self.choose_move,
+                bot_game.grid,
+                bot_game.rack,
+            )
+
+            if self.stats is not None:
+                self.stats.solve_times.append(time.perf_counter() - start)
+
+            if placement is not None:
+                await self.put_placement(bot_game, placement)
+
+                if self.stats is not None:
+                    self.stats.moves += 1
+
+                print(f"{self.name} in {bot_game.id}: {placement.json()}")
+            else:
+                print(f"{self.name} in {bot_game.id}: no valid placement found.")
+                await asyncio.sleep(STREAM_TIMEOUT)
+
+    async def play(self, game: str):
+        """Play `game` until it is completed, backing off after errors."""
+        bot_game = self.get_game(game)
+        failures = 0
+
+        while bot_game.state is not GameState.Completed:
+            try:
+                await self.work(bot_game)
+                failures = 0
+            except BotError as error:
+                if self.stats is not None:
+                    self.stats.errors += 1
+
+                delay = min(MAX_BACKOFF, BACKOFF * 2**failures)
+                failures += 1
+                print(f"{self.name} in {game}: {error}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay * random.uniform(0.5, 1))
+
+        if self.stats is not None:
+            self.stats.games_completed += 1
+
+    async def join_and_play(self, game: str):
+        for action in (self.create_game, self.join_game):
+            try:
+                await action(game)
+            except BotError as error:
+                print(f"{self.name} in {game}: {error}")
+
+        await self.play(game)
+
+    async def run(self, games: Iterable[str]):
+        await asyncio.gather(*(self.join_and_play(i) for i in games))
+
+
+async def main(name: str, games: Iterable[str], host: str, budget: Optional[float]):
+    solve_cache = SolveCache(load_lexicon())
+    strategy = None
+
+    if budget is not None:
+        strategy = MonteCarloStrategy(solve_cache.lexicon, budget=budget)
+
+    async with AsyncScrabbleBot(name, host, solve_cache, strategy=strategy) as bot:
+        await bot.run(games)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("name")
+    parser.add_argument("games", nargs="+")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Seconds to look ahead for each move, rather than play the best.",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.name, args.games, args.host, args.budget))
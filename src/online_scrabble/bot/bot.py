@@ -1,4 +1,5 @@
 import argparse
+import random
 from base64 import b64encode
 from enum import Enum
 from time import sleep
@@ -6,13 +7,29 @@ from typing import List, Optional
 
 import requests
 
-from online_scrabble.core import Grid, Placement, ScoredPlacement, SolutionBuilder, Trie
+from online_scrabble.bot.strategy import MonteCarloStrategy
+from online_scrabble.core import (
+    Grid,
+    load_lexicon,
+    Placement,
+    ScoredPlacement,
+    SolveCache,
+    Trie,
+)
 
 
 HOST = "http://localhost:8000"
 
 GAME_NAME = "game1"
 
+# Seconds the server waits for a change before answering a stream request.
+STREAM_TIMEOUT = 25
+
+# Seconds to wait after the first failure in a row, doubled for every
+# further one up to MAX_BACKOFF.
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+
 
 class GameState(Enum):
     InProgress = "in_progress"
@@ -25,7 +42,12 @@ class BotError(Exception):
 
 
 class ScrabbleBot:
-    def __init__(self, name: str):
+    def __init__(
+        self,
+        name: str,
+        trie: Optional[Trie] = None,
+        strategy: Optional[MonteCarloStrategy] = None,
+    ):
         self.name = name
 
         self.grid = None
@@ -34,8 +56,11 @@ class ScrabbleBot:
         self.state = None
         self.turn = None
         self.number_of_players = None
+        self.versions = {}
 
-        self.trie = Trie.load("dictionary.txt")
+        self.trie = trie or load_lexicon()
+        self.solve_cache = SolveCache(self.trie)
+        self.strategy = strategy
 
     def get_headers(self):
         authorization = b64encode(f"{self.name}:".encode("utf-8")).decode("utf-8")
@@ -59,7 +84,16 @@ class ScrabbleBot:
         print(placement.json())
 
     def fetch_game(self, game: str):
-        response = requests.get(f"{HOST}/game/{game}", headers=self.get_headers())
+        headers = self.get_headers()
+
+        if game in self.versions:
+            headers["If-None-Match"] = f'"{self.versions[game]}"'
+
+        response = requests.get(f"{HOST}/game/{game}", headers=headers)
+
+        if response.status_code == 304:
+            return
+
         response_json = response.json()
 
         if "message" in response_json:
@@ -70,6 +104,50 @@ class ScrabbleBot:
         self.turn = response_json["turn"]
         self.number_of_players = len(response_json["players"])
 
+        if "ETag" in response.headers:
+            self.versions[game] = response.headers["ETag"].strip('"')
+
+    def fetch_events(self, game: str, wait: bool = False):
+        """Bring the grid up to date with the events since the last fetch.
+
+        With `wait` the server holds the request until something happens.
+        """
+        if game not in self.versions or self.grid is None:
+            self.fetch_game(game)
+            return
+
+        if wait:
+            response = requests.get(
+                f"{HOST}/game/{game}/stream",
+                headers=self.get_headers(),
+                params={"since": self.versions[game], "timeout": STREAM_TIMEOUT},
+                timeout=STREAM_TIMEOUT + 10,
+            )
+        else:
+            response = requests.get(
+                f"{HOST}/game/{game}/events",
+                headers=self.get_headers(),
+                params={"since": self.versions[game]},
+            )
+
+        response_json = response.json()
+
+        if "message" in response_json:
+            # The game may have been deleted and created again, so fetch
+            # all of it next time.
+            del self.versions[game]
+            raise BotError(response_json["message"])
+
+        for event in response_json["events"]:
+            if event["type"] == "join":
+                self.number_of_players += 1
+            elif event["type"] == "placement":
+                self.grid.insert(ScoredPlacement.from_json(event["placement"]))
+
+        self.state = GameState(response_json["state"])
+        self.turn = response_json["turn"]
+        self.versions[game] = response_json["version"]
+
     def our_turn(self) -> bool:
         return self.state is GameState.InProgress and self.turn == self.name
 
@@ -117,14 +195,19 @@ class ScrabbleBot:
             raise BotError(response_json["message"])
 
     def get_highest_scoring_move(self, rack: List[str]) -> Optional[ScoredPlacement]:
-        solution_builder = SolutionBuilder(self.grid, self.trie)
-        placements = solution_builder.solve("".join(rack))
+        placements = self.solve_cache.solve(self.grid, "".join(rack), top_k=1)
 
         if len(placements) == 0:
             return None
 
         return placements[-1]
 
+    def choose_move(self, rack: str) -> Optional[ScoredPlacement]:
+        if self.strategy is not None:
+            return self.strategy.choose(self.grid, rack)
+
+        return self.get_highest_scoring_move(rack)
+
     def work(self, game: str):
         if (
             self.turn is None
@@ -136,26 +219,38 @@ class ScrabbleBot:
             except BotError:
                 pass
 
-        self.fetch_game(game)
+        self.fetch_events(game, wait=not self.our_turn())
 
         if self.our_turn():
             if self.rack is None:
                 self.get_player_state(game)
 
-            placement = self.get_highest_scoring_move(self.rack)
+            placement = self.choose_move(self.rack)
 
             if placement is not None:
                 self.put_placement(game, placement)
             else:
                 print("No valid placement found.")
+                sleep(STREAM_TIMEOUT)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("name")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Seconds to look ahead for each move, rather than play the best.",
+    )
     args = parser.parse_args()
 
-    scrabble_bot = ScrabbleBot(args.name)
+    trie = load_lexicon()
+    strategy = None
+
+    if args.budget is not None:
+        strategy = MonteCarloStrategy(trie, budget=args.budget)
+
+    scrabble_bot = ScrabbleBot(args.name, trie, strategy)
     print(f"Creating + joining {GAME_NAME}...")
 
     try:
@@ -168,8 +263,14 @@ if __name__ == "__main__":
     except BotError as e:
         print(e)
 
+    failures = 0
+
     while True:
         try:
             scrabble_bot.work(GAME_NAME)
+            failures = 0
         except BotError as e:
-            print(e)
+            delay = min(MAX_BACKOFF, BACKOFF * 2**failures)
+            failures += 1
+            print(f"{e}, retrying in {delay:.1f}s")
+            sleep(delay * random.uniform(0.5, 1))
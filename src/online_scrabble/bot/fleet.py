@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from online_scrabble.bot.async_bot import MAX_CONNECTIONS, AsyncScrabbleBot
+from online_scrabble.bot.bot import HOST
+from online_scrabble.bot.stats import BotStats, describe_stats
+from online_scrabble.bot.strategy import MonteCarloStrategy
+from online_scrabble.core import load_lexicon, SolveCache
+
+
+def assign_games(config: dict) -> Dict[str, List[str]]:
+    """The games each bot of a fleet configuration plays.
+
+    Either the configuration names the games of every bot:
+
+        {"bots": {"house-1": ["game-1", "game-2"], "house-2": ["game-1"]}}
+
+    or it has `bot_count` bots named `name_prefix`-1, -2 and so on, and
+    deals them out in turn to `games`, `players_per_game` to a game:
+
+        {"bot_count": 50, "games": ["game-1", "game-2"], "players_per_game": 2}
+
+    The configuration may also give the `host`, the number of `processes`
+    and a lookahead `budget` in seconds per move.
+    """
+    if "bots" in config:
+        return {name: list(games) for name, games in config["bots"].items()}
+
+    prefix = config.get("name_prefix", "house")
+    names = [f"{prefix}-{i + 1}" for i in range(config["bot_count"])]
+    assignment = {name: [] for name in names}
+    players_per_game = config.get("players_per_game", 2)
+
+    for index, game in enumerate(config["games"]):
+        for player in range(players_per_game):
+            name = names[(index * players_per_game + player) % len(names)]
+
+            if game not in assignment[name]:
+                assignment[name].append(game)
+
+    return assignment
+
+
+def count_players(assignment: Dict[str, List[str]]) -> Dict[str, int]:
+    """The number of bots that `assignment` sends to each game."""
+    return dict(Counter(game for games in assignment.values() for game in games))
+
+
+async def run_fleet(
+    host: str,
+    assignment: Dict[str, List[str]],
+    budget: Optional[float] = None,
+    players: Optional[Dict[str, int]] = None,
+) -> Dict[str, dict]:
+    """Play every bot of `assignment` until its games are completed.
+
+    The bots share one lexicon, solve cache and solver thread, and one
+    pooled HTTP session. With a `budget` they look ahead for that many
+    seconds a move, see `MonteCarloStrategy`. A game starts once the number
+    of bots `players` gives for it have joined, by default every bot that
+    `assignment` sends to it. Returns the `BotStats` of each bot.
+    """
+    if players is None:
+        players = count_players(assignment)
+
+    solve_cache = SolveCache(load_lexicon())
+    strategy = None
+
+    if budget is not None:
+        strategy = MonteCarloStrategy(solve_cache.lexicon, budget=budget)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    stats = {name: BotStats() for name in assignment}
+
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    ) as session:
+        bots = [
+            AsyncScrabbleBot(
+                name,
+                host,
+                solve_cache,
+                session,
+                executor,
+                stats[name],
+                strategy,
+                players,
+            )
+            for name in assignment
+        ]
+        await asyncio.gather(*(bot.run(assignment[bot.name]) for bot in bots))
+
+    executor.shutdown()
+    return {name: i.json() for name, i in stats.items()}
+
+
+def run_process(
+    host: str,
+    assignment: Dict[str, List[str]],
+    budget: Optional[float],
+    players: Dict[str, int],
+) -> Dict[str, dict]:
+    return asyncio.run(run_fleet(host, assignment, budget, players))
+
+
+def run(
+    host: str,
+    assignment: Dict[str, List[str]],
+    processes: int,
+    budget: Optional[float] = None,
+) -> Dict[str, dict]:
+    """Run the fleet with its bots dealt out to `processes` processes.
+
+    Each process memory-maps the compiled lexicon (see `Dawg.open`), so
+    they share one read-only copy of it through the page cache.
+    """
+    # Counted before the bots are dealt out, as the players of one game may
+    # end up in different processes.
+    players = count_players(assignment)
+
+    if processes <= 1:
+        return run_process(host, assignment, budget, players)
+
+    names = list(assignment)
+    parts = [
+        {name: assignment[name] for name in names[part::processes]}
+        for part in range(processes)
+    ]
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for result in executor.map(
+            run_process,
+            [host] * processes,
+            parts,
+            [budget] * processes,
+            [players] * processes,
+        ):
+            results.update(result)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Host many house bots in one process or a few of them."
+    )
+    parser.add_argument("config", help="JSON fleet configuration, see assign_games.")
+    parser.add_argument("--output", help="Write the bot stats here as JSON.")
+    args = parser.parse_args()
+
+    with open(args.config, encoding="utf-8") as source:
+        config = json.load(source)
+
+    results = run(
+        config.get("host", HOST),
+        assign_games(config),
+        config.get("processes", 1),
+        config.get("budget"),
+    )
+
+    for name, stats in results.items():
+        print(f"{name}: {describe_stats(stats)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import time
+from typing import List
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of `values`, 0 if there are none."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BotStats:
+    """Throughput and latency of a bot, see `AsyncScrabbleBot`.
+
+    Times are in seconds. `solve_times` is the time taken to find each
+    move, including any wait for the executor, and `request_times` the
+    round trip of every request except the stream requests, which wait on
+    the other players.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+
+        self.moves = 0
+        self.games_completed = 0
+        self.errors = 0
+
+        self.solve_times: List[float] = []
+        self.request_times: List[float] = []
+
+    def json(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+
+        return {
+            "moves": self.moves,
+            "games_completed": self.games_completed,
+            "errors": self.errors,
+            "moves_per_second": self.moves / elapsed if elapsed else 0.0,
+            "solve_time_p50": percentile(self.solve_times, 0.5),
+            "solve_time_p95": percentile(self.solve_times, 0.95),
+            "request_time_p50": percentile(self.request_times, 0.5),
+            "request_time_p95": percentile(self.request_times, 0.95),
+        }
+
+    def __str__(self) -> str:
+        return describe_stats(self.json())
+
+
+def describe_stats(stats: dict) -> str:
+    """One line summary of `BotStats.json`."""
+    return (
+        f"{stats['moves']} moves ({stats['moves_per_second']:.2f}/s), "
+        f"{stats['games_completed']} games completed, {stats['errors']} errors; "
+        f"solve p50 {stats['solve_time_p50'] * 1000:.1f}ms "
+        f"p95 {stats['solve_time_p95'] * 1000:.1f}ms, "
+        f"request p50 {stats['request_time_p50'] * 1000:.1f}ms "
+        f"p95 {stats['request_time_p95'] * 1000:.1f}ms"
+    )
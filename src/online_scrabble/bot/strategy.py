@@ -0,0 +1,100 @@
+import random
+import time
+from typing import Dict, List, Optional
+
+from online_scrabble.core import (
+    Bag,
+    Grid,
+    GridSnapshot,
+    ScoredPlacement,
+    SolutionBuilder,
+    Trie,
+)
+from online_scrabble.core.bag import WILD_LETTER
+from online_scrabble.core.rack import RACK_LENGTH
+
+CANDIDATES = 10
+
+# Seconds a move may take. Simulations are only started before the budget
+# runs out, so a move can take up to one solve longer.
+BUDGET = 1.0
+
+
+def unseen_tiles(grid: Grid, rack: str) -> List[str]:
+    """The tiles in the bag or on the other racks, as seen by `rack`."""
+    unseen = Bag.new().content
+
+    for tile in grid.tiles:
+        if tile.value:
+            unseen.remove(WILD_LETTER if tile.wild else tile.value)
+
+    for char in rack:
+        unseen.remove(char)
+
+    return unseen
+
+
+class MonteCarloStrategy:
+    """Choose moves by simulating the opponent's reply.
+
+    The `candidates` highest scoring moves are played in turn against
+    opponent racks drawn from the unseen tiles, and each is valued by its
+    score less the best reply's, averaged over its simulations. This goes
+    on until `budget` seconds have passed, when the move with the best
+    average so far is chosen, or the highest scoring one if there was no
+    time to simulate at all.
+    """
+
+    def __init__(
+        self,
+        lexicon: Trie,
+        candidates: int = CANDIDATES,
+        budget: float = BUDGET,
+        rng: Optional[random.Random] = None,
+    ):
+        self.lexicon = lexicon
+        self.candidates = candidates
+        self.budget = budget
+        self.rng = rng or random
+
+    def choose(self, grid: Grid, rack: str) -> Optional[ScoredPlacement]:
+        deadline = time.perf_counter() + self.budget
+        candidates = list(
+            reversed(SolutionBuilder(grid, self.lexicon).solve(rack, self.candidates))
+        )
+
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+
+        unseen = unseen_tiles(grid, rack)
+        # Candidate boards are built from a snapshot, which only copies the
+        # rows a candidate changes, rather than from copies of `grid`.
+        board = GridSnapshot.from_grid(grid)
+        grids: Dict[int, Grid] = {}
+        totals = [0] * len(candidates)
+        counts = [0] * len(candidates)
+        index = 0
+
+        while time.perf_counter() < deadline and unseen:
+            candidate = candidates[index]
+
+            if index not in grids:
+                grids[index] = board.with_placement(candidate).to_grid()
+
+            opponent_rack = "".join(
+                self.rng.sample(unseen, min(RACK_LENGTH, len(unseen)))
+            )
+            replies = SolutionBuilder(grids[index], self.lexicon).solve(
+                opponent_rack, best_only=True
+            )
+
+            totals[index] += candidate.score - (replies[-1].score if replies else 0)
+            counts[index] += 1
+            index = (index + 1) % len(candidates)
+
+        simulated = [i for i in range(len(candidates)) if counts[i]]
+
+        if not simulated:
+            return candidates[0]
+
+        return candidates[max(simulated, key=lambda i: totals[i] / counts[i])]
@@ -1,12 +1,14 @@
 from online_scrabble.bot.bot import BotError, ScrabbleBot
+from online_scrabble.core import load_lexicon
 
 
 GAME_NAME = "game-two-bots"
 
 
 if __name__ == "__main__":
-    bot1 = ScrabbleBot("bot1")
-    bot2 = ScrabbleBot("bot2 has a really long name really long name")
+    trie = load_lexicon()
+    bot1 = ScrabbleBot("bot1", trie)
+    bot2 = ScrabbleBot("bot2 has a really long name really long name", trie)
 
     bot1.create_game(GAME_NAME)
 
@@ -1,9 +1,16 @@
+from .array_grid import ArrayGrid
 from .bag import Bag
 from .character import Character
+from .dawg import Dawg, DawgError, DawgNode, load_lexicon
+from .gaddag import build_gaddag, load_gaddag
 
 # from .game import Game, GameError, GameState
 from .grid import Grid
+from .parallel import ParallelSolver
 from .placement import Placement, ScoredPlacement
 from .player import Player
-from .solution_builder import SolutionBuilder
+from .snapshot import GridSnapshot
+from .solution_builder import PlacementError, SolutionBuilder
+from .solve_cache import SolveCache
+from .stats import SolverStats
 from .trie import Trie
@@ -62,14 +62,66 @@ def create_anchor(grid: Grid, trie: Trie, x: int, y: int) -> Optional[Anchor]:
     return Anchor(x, y, x_length, y_length, x_trie, y_trie)
 
 
-def calculate_anchors(grid: Grid, trie: Trie) -> List[Anchor]:
-    anchors = []
+def update_anchors(grid: Grid, trie: Trie) -> None:
+    """Recreate the anchors that the squares in `grid.touched` can affect.
+
+    Filling a square changes which of it and its neighbours are anchors.
+    The lengths and prefixes of an anchor only look left and up as far as
+    the first tile or anchor, so beyond those squares only the squares up to
+    the next anchor to the right and below need to be recreated.
+    """
+    changed = set()
+
+    for x, y in grid.touched:
+        changed |= {(x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)}
+
+    squares = set()
+
+    for x, y in changed:
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            continue
+
+        squares.add((x, y))
 
-    for y in range(grid.height):
-        for x in range(grid.width):
-            anchor = create_anchor(grid, trie, x, y)
-            if anchor:
-                anchors += [anchor]
+        for i in range(x + 1, grid.width):
+            squares.add((i, y))
+            if is_anchor(grid, i, y):
+                break
+
+        for j in range(y + 1, grid.height):
+            squares.add((x, j))
+            if is_anchor(grid, x, j):
+                break
+
+    for x, y in squares:
+        anchor = create_anchor(grid, trie, x, y)
+        if anchor:
+            grid.anchors[(x, y)] = anchor
+        else:
+            grid.anchors.pop((x, y), None)
+
+
+def calculate_anchors(grid: Grid, trie: Trie) -> List[Anchor]:
+    """The anchors of `grid` in reading order.
+
+    They are kept on the grid, so later calls with the same `trie` only
+    revisit the squares around the tiles inserted in between.
+    """
+    if grid.anchor_lexicon is not trie:
+        grid.anchor_lexicon = trie
+        grid.anchors = {}
+
+        for y in range(grid.height):
+            for x in range(grid.width):
+                anchor = create_anchor(grid, trie, x, y)
+                if anchor:
+                    grid.anchors[(x, y)] = anchor
+    elif grid.touched:
+        update_anchors(grid, trie)
+
+    grid.touched = []
+
+    anchors = [grid.anchors[i] for i in sorted(grid.anchors, key=lambda i: i[::-1])]
 
     if not anchors:
         grid_w2 = int(grid.width / 2)
@@ -0,0 +1,117 @@
+from typing import List
+
+import numpy as np
+
+from .character import Character
+from .grid import Grid
+from .tile import Tile, TileType
+
+TILE_TYPES = list(TileType)
+
+# Planes of `ArrayGrid.board`.
+LETTERS = 0
+BLANKS = 1
+NEW_TILES = 2
+PREMIUMS = 3
+
+
+class ArrayGrid(Grid):
+    """A `Grid` stored as one `uint8` array of four planes.
+
+    The planes hold the letter code (0 for an empty square), the blank flag,
+    the new tile flag and the index of the square's `TileType`. `tiles` and
+    `get_tile` build `Tile`s from the arrays, so changes to those tiles are
+    not kept; use `insert` to change the board.
+
+    This backend is for storing and copying boards, which it does much
+    faster than `Grid`. Move generation reads squares one at a time through
+    `get_tile`, which is slower here, so solving on an `ArrayGrid` takes
+    1.5 to 2 times as long as on a `Grid`. Solve on `Grid.from_json` of it
+    instead, or use `row` and `column` to read whole lines.
+    """
+
+    def __init__(self, width: int, height: int, tiles: List[Tile]):
+        self.board = np.zeros((4, height, width), dtype=np.uint8)
+        super().__init__(width, height, tiles)
+
+    @property
+    def letters(self) -> np.ndarray:
+        return self.board[LETTERS]
+
+    @property
+    def tiles(self) -> List[Tile]:
+        return [
+            self.get_tile(x, y) for y in range(self.height) for x in range(self.width)
+        ]
+
+    @tiles.setter
+    def tiles(self, tiles: List[Tile]) -> None:
+        for index, tile in enumerate(tiles):
+            y, x = divmod(index, self.width)
+            self.board[:, y, x] = (
+                ord(tile.value) if tile.value else 0,
+                tile.wild,
+                tile.cross_check,
+                TILE_TYPES.index(tile.type),
+            )
+
+    def get_tile(self, x: int, y: int) -> Tile:
+        letter, blank, new_tile, premium = self.board[:, y, x].tolist()
+        return Tile(
+            TILE_TYPES[premium],
+            chr(letter) if letter else None,
+            blank == 1,
+            new_tile == 1,
+        )
+
+    def row(self, y: int) -> bytes:
+        """Letter codes along row `y`, with 0 for empty squares."""
+        return self.board[LETTERS, y].tobytes()
+
+    def column(self, x: int) -> bytes:
+        """Letter codes down column `x`, with 0 for empty squares."""
+        return self.board[LETTERS, :, x].tobytes()
+
+    def get_word(self, x: int, y: int, horizontal: bool) -> str:
+        line, position = (self.row(y), x) if horizontal else (self.column(x), y)
+
+        if not line[position]:
+            return ""
+
+        start = line.rfind(b"\0", 0, position) + 1
+        end = line.find(b"\0", position)
+
+        return line[start : None if end == -1 else end].decode()
+
+    def layout_key(self) -> bytes:
+        return self.board[PREMIUMS].tobytes()
+
+    def put(self, x: int, y: int, character: Character) -> None:
+        self.board[:3, y, x] = (ord(character.value), character.wild, True)
+
+    def is_empty(self) -> bool:
+        return not self.letters.any()
+
+    def reset_crosscheck(self):
+        self.board[NEW_TILES] = 0
+
+    def copy_board(self):
+        grid = ArrayGrid(self.width, self.height, [])
+        grid.board = self.board.copy()
+        return grid
+
+    @staticmethod
+    def from_grid(grid: Grid):
+        return ArrayGrid(grid.width, grid.height, grid.tiles)
+
+    @staticmethod
+    def empty(width: int, height: int):
+        return ArrayGrid.from_grid(Grid.empty(width, height))
+
+    @staticmethod
+    def large():
+        return ArrayGrid.from_grid(Grid.large())
+
+    @staticmethod
+    def from_json(json_data: dict):
+        return ArrayGrid.from_grid(Grid.from_json(json_data))
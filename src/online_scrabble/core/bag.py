@@ -1,5 +1,5 @@
-from random import randrange
-from typing import List
+import random
+from typing import List, Optional
 
 
 WILD_LETTER = " "
@@ -10,26 +10,41 @@ class BagError(Exception):
 
 
 class Bag:
-    def __init__(self, content: List[str]):
+    def __init__(self, content: List[str], rng: Optional[random.Random] = None):
         self.content = content
 
+        # Draws use the `random` module unless given a seeded generator.
+        self.rng = rng or random
+
     def add_character(self, char: str, count: int) -> None:
         for _index in range(count):
             self.content += [char]
 
     def get_character(self) -> str:
         try:
-            index = randrange(len(self.content))
+            index = self.rng.randrange(len(self.content))
         except ValueError as error:
             raise BagError("The bag is empty.") from error
         return self.content.pop(index)
 
+    def sample(self, count: int) -> List[str]:
+        """Up to `count` random letters, which are not taken from the bag."""
+        return self.rng.sample(self.content, min(count, len(self.content)))
+
+    def remove_characters(self, chars: str) -> None:
+        for char in chars:
+            self.content.remove(char)
+
     def json(self):
         return self.content
 
     @staticmethod
-    def new():
-        bag = Bag([])
+    def from_json(json_data: List[str]):
+        return Bag(list(json_data))
+
+    @staticmethod
+    def new(rng: Optional[random.Random] = None):
+        bag = Bag([], rng)
 
         bag.add_character(WILD_LETTER, 2)
 
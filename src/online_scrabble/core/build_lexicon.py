@@ -0,0 +1,22 @@
+import argparse
+
+from .dawg import Dawg
+from .gaddag import build_gaddag
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile a word list to a lexicon.")
+    parser.add_argument("dictionary", help="Word list, one word per line.")
+    parser.add_argument("output", help="Lexicon file to write.")
+    parser.add_argument(
+        "--gaddag", action="store_true", help="Write a GADDAG instead of a DAWG."
+    )
+    args = parser.parse_args()
+
+    if args.gaddag:
+        with open(args.dictionary, encoding="utf-8") as dictionary:
+            lexicon = build_gaddag(i.rstrip("\n") for i in dictionary if i.strip())
+    else:
+        lexicon = Dawg.load(args.dictionary)
+
+    lexicon.save(args.output)
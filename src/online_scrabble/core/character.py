@@ -1,6 +1,36 @@
 from functools import total_ordering
 
 
+char_scores = {
+    "A": 1,
+    "B": 4,
+    "C": 4,
+    "D": 2,
+    "E": 1,
+    "F": 4,
+    "G": 3,
+    "H": 3,
+    "I": 1,
+    "J": 10,
+    "K": 5,
+    "L": 2,
+    "M": 4,
+    "N": 2,
+    "O": 1,
+    "P": 4,
+    "Q": 10,
+    "R": 1,
+    "S": 1,
+    "T": 1,
+    "U": 2,
+    "V": 5,
+    "W": 4,
+    "X": 8,
+    "Y": 3,
+    "Z": 10,
+}
+
+
 @total_ordering
 class Character:
     def __init__(self, value: str, wild: bool):
@@ -0,0 +1,273 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+FORMAT_MAGIC = b"OSDAWG"
+FORMAT_VERSION = 1
+
+# Magic, byte order, padding, format version, node count and edge count.
+HEADER = struct.Struct("=6scxIII")
+
+
+class DawgError(Exception):
+    pass
+
+
+class DawgNode:
+    __slots__ = ("dawg", "index", "value", "_children")
+
+    def __init__(self, dawg: "Dawg", index: int, value: Optional[str]):
+        self.dawg = dawg
+        self.index = index
+        self.value = value
+        self._children = None
+
+    @property
+    def valid(self) -> bool:
+        return self.dawg.terminal[self.index] == 1
+
+    @property
+    def children(self) -> Dict[str, "DawgNode"]:
+        if self._children is None:
+            self._children = {
+                letter: DawgNode(self.dawg, target, letter)
+                for letter, target in self.dawg.edges(self.index)
+            }
+        return self._children
+
+    def find(self, word: str) -> Optional["DawgNode"]:
+        if len(word) == 0:
+            return None
+
+        index = self.index
+
+        for char in word.upper():
+            index = self.dawg.child(index, char)
+            if index is None:
+                return None
+
+        return DawgNode(self.dawg, index, word[-1].upper())
+
+    def contains(self, word: str) -> bool:
+        node = self.find(word)
+        return node is not None and node.valid
+
+
+class _BuildNode:
+    __slots__ = ("edges", "final", "number")
+
+    def __init__(self):
+        self.edges = {}
+        self.final = False
+        self.number = None
+
+    def signature(self) -> Tuple:
+        return (
+            self.final,
+            tuple((letter, child.number) for letter, child in self.edges.items()),
+        )
+
+
+class Dawg(DawgNode):
+    """Minimised word graph with every node's edges stored contiguously.
+
+    The edges of node `n` are `offsets[n]` up to `offsets[n + 1]`; each edge
+    has an ASCII letter in `letters` and a destination node in `targets`.
+    Node 0 is the root, so a `Dawg` can be used wherever a `Trie` is.
+
+    The arrays may be views into a read-only memory map (see `Dawg.open`), in
+    which case the letters start `letter_base` bytes into the mapping.
+    """
+
+    __slots__ = (
+        "offsets",
+        "letters",
+        "targets",
+        "terminal",
+        "letter_base",
+        "code_edges",
+    )
+
+    def __init__(self, offsets, letters, targets, terminal, letter_base: int = 0):
+        super().__init__(self, 0, None)
+        self.offsets = offsets
+        self.letters = letters
+        self.targets = targets
+        self.terminal = terminal
+        self.letter_base = letter_base
+
+        # Filled in by `code_children` as the nodes are first visited.
+        self.code_edges: Dict[int, Dict[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.terminal)
+
+    def edges(self, index: int) -> Iterator[Tuple[str, int]]:
+        base = self.letter_base
+        for edge in range(self.offsets[index], self.offsets[index + 1]):
+            yield chr(self.letters[base + edge]), self.targets[edge]
+
+    def child(self, index: int, char: str) -> Optional[int]:
+        base = self.letter_base
+        edge = self.letters.find(
+            char.encode(), base + self.offsets[index], base + self.offsets[index + 1]
+        )
+        return None if edge == -1 else self.targets[edge - base]
+
+    def code_children(self, index: int) -> Dict[int, int]:
+        """Targets of the edges of node `index` by character code, cached."""
+        children = self.code_edges.get(index)
+
+        if children is None:
+            base = self.letter_base
+            children = self.code_edges[index] = {
+                self.letters[base + edge]: self.targets[edge]
+                for edge in range(self.offsets[index], self.offsets[index + 1])
+            }
+
+        return children
+
+    def save(self, path: str) -> None:
+        edge_count = len(self.targets)
+        letters = self.letters[self.letter_base : self.letter_base + edge_count]
+        byte_order = b"<" if sys.byteorder == "little" else b">"
+
+        with open(path, "wb") as output:
+            output.write(
+                HEADER.pack(
+                    FORMAT_MAGIC, byte_order, FORMAT_VERSION, len(self), edge_count
+                )
+            )
+            output.write(bytes(self.offsets))
+            output.write(bytes(self.targets))
+            output.write(bytes(self.terminal))
+            output.write(bytes(letters))
+
+    @staticmethod
+    def build(words: Iterable[str]):
+        root = _BuildNode()
+        register = {}
+        unchecked: List[Tuple[_BuildNode, str, _BuildNode]] = []
+        previous = ""
+
+        def minimise(depth: int) -> None:
+            while len(unchecked) > depth:
+                parent, letter, child = unchecked.pop()
+                signature = child.signature()
+                existing = register.get(signature)
+                if existing is None:
+                    child.number = len(register)
+                    register[signature] = child
+                else:
+                    parent.edges[letter] = existing
+
+        for word in sorted({i.upper() for i in words if i}):
+            common = 0
+            while (
+                common < len(previous)
+                and common < len(word)
+                and previous[common] == word[common]
+            ):
+                common += 1
+
+            minimise(common)
+
+            node = unchecked[-1][2] if unchecked else root
+
+            for letter in word[common:]:
+                child = _BuildNode()
+                node.edges[letter] = child
+                unchecked.append((node, letter, child))
+                node = child
+
+            node.final = True
+            previous = word
+
+        minimise(0)
+
+        # Registration numbers children before parents, so reversing that
+        # order (with the root in front) keeps node 0 as the root.
+        nodes = [root] + sorted(register.values(), key=lambda i: -i.number)
+        index_map = {id(node): index for index, node in enumerate(nodes)}
+
+        offsets = array("I", [0])
+        letters = bytearray()
+        targets = array("I")
+        terminal = array("B")
+
+        for node in nodes:
+            for letter, child in node.edges.items():
+                letters.append(ord(letter))
+                targets.append(index_map[id(child)])
+            offsets.append(len(letters))
+            terminal.append(1 if node.final else 0)
+
+        return Dawg(offsets, bytes(letters), targets, terminal)
+
+    @staticmethod
+    def load(path: str):
+        with open(path, encoding="utf-8") as dictionary:
+            return Dawg.build(i.rstrip("\n") for i in dictionary)
+
+    @staticmethod
+    def open(path: str):
+        """Map a file written by `Dawg.save` without copying it.
+
+        The mapping is read-only, so every process that opens the same file
+        shares one copy of it through the page cache.
+        """
+        with open(path, "rb") as source:
+            mapping = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, byte_order, version, node_count, edge_count = HEADER.unpack_from(
+                mapping
+            )
+        except struct.error as error:
+            raise DawgError(f"{path} is not a lexicon file.") from error
+
+        if magic != FORMAT_MAGIC:
+            raise DawgError(f"{path} is not a lexicon file.")
+
+        if byte_order != (b"<" if sys.byteorder == "little" else b">"):
+            raise DawgError(f"{path} was built on a machine of a different byte order.")
+
+        if version != FORMAT_VERSION:
+            raise DawgError(
+                f"{path} has format version {version}, expected {FORMAT_VERSION}."
+            )
+
+        sizes = [4 * (node_count + 1), 4 * edge_count, node_count, edge_count]
+
+        if len(mapping) != HEADER.size + sum(sizes):
+            raise DawgError(f"{path} is truncated.")
+
+        view = memoryview(mapping)
+        start = HEADER.size
+        sections = []
+
+        for size in sizes:
+            sections.append(view[start : start + size])
+            start += size
+
+        offsets, targets, terminal, _letters = sections
+
+        return Dawg(
+            offsets.cast("I"),
+            mapping,
+            targets.cast("I"),
+            terminal,
+            start - edge_count,
+        )
+
+
+def load_lexicon(
+    binary_path: str = "dictionary.dawg", text_path: str = "dictionary.txt"
+) -> Dawg:
+    if os.path.exists(binary_path):
+        return Dawg.open(binary_path)
+    return Dawg.load(text_path)
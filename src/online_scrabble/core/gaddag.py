@@ -0,0 +1,33 @@
+import os
+from typing import Iterable, Iterator
+
+from .dawg import Dawg
+
+
+SEPARATOR = ">"
+
+
+def gaddag_strings(word: str) -> Iterator[str]:
+    """Every way of reading `word` outwards from one of its letters.
+
+    Each string is the letters up to and including the starting one in
+    reverse, then `SEPARATOR` and the rest of the word. Starting from the
+    last letter needs no separator.
+    """
+    for i in range(1, len(word)):
+        yield word[i - 1 :: -1] + SEPARATOR + word[i:]
+    yield word[::-1]
+
+
+def build_gaddag(words: Iterable[str]) -> Dawg:
+    return Dawg.build(i for word in words for i in gaddag_strings(word.upper()))
+
+
+def load_gaddag(
+    binary_path: str = "dictionary.gaddag", text_path: str = "dictionary.txt"
+) -> Dawg:
+    if os.path.exists(binary_path):
+        return Dawg.open(binary_path)
+
+    with open(text_path, encoding="utf-8") as dictionary:
+        return build_gaddag(i.rstrip("\n") for i in dictionary if i.strip())
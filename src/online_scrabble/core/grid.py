@@ -1,9 +1,20 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 from colorama import Fore, Style
 
+from online_scrabble.core.character import char_scores, Character
 from online_scrabble.core.placement import Placement
 from online_scrabble.core.tile import Tile, TileType
+from online_scrabble.core.zobrist import square_key
+
+ALL_LETTERS = (1 << 26) - 1
+
+# Index of each `TileType`, as used by `Grid.layout_key`.
+TILE_TYPE_INDEXES = {tile_type: i for i, tile_type in enumerate(TileType)}
+
+
+def letter_bit(char: str) -> int:
+    return 1 << (ord(char) - ord("A"))
 
 
 class Grid:
@@ -12,6 +23,32 @@ class Grid:
         self.height = height
         self.tiles = tiles
 
+        # Letters allowed on each square by the word formed perpendicular to
+        # a horizontal or vertical play, and the score of the letters already
+        # in that word (None when there is none), see `prepare_cross_checks`.
+        self.lexicon = None
+        self.horizontal_masks = None
+        self.vertical_masks = None
+        self.horizontal_sums = None
+        self.vertical_sums = None
+
+        # Anchors by square against `anchor_lexicon`, and the squares filled
+        # since they were last brought up to date, see `calculate_anchors`.
+        self.anchor_lexicon = None
+        self.anchors = None
+        self.touched = []
+
+        # Zobrist hash of the letters on the board, kept up to date by
+        # `insert`, see `zobrist.position_hash`.
+        self.zobrist = 0
+
+        # The premium squares as bytes, see `layout_key`.
+        self.layout = None
+
+        for index, tile in enumerate(tiles):
+            if tile.value:
+                self.zobrist ^= square_key(index, tile.value, tile.wild)
+
     def json(self) -> dict:
         return {
             "width": self.width,
@@ -19,6 +56,12 @@ class Grid:
             "tiles": [i.json() for i in self.tiles],
         }
 
+    def layout_key(self) -> bytes:
+        """The `TileType` index of every square, computed once per board."""
+        if self.layout is None:
+            self.layout = bytes(TILE_TYPE_INDEXES[i.type] for i in self.tiles)
+        return self.layout
+
     def __str__(self) -> str:
         result = ""
         for y in range(self.height):
@@ -65,36 +108,176 @@ class Grid:
     def get_tile(self, x: int, y: int) -> Tile:
         return self.tiles[y * self.width + x]
 
+    def perpendicular_word(
+        self, x: int, y: int, horizontal: bool
+    ) -> Tuple[str, str, Optional[int]]:
+        """Letters either side of (x, y) across a play, and their score."""
+        step_x, step_y = (0, 1) if horizontal else (1, 0)
+        partial_score = 0
+
+        prefix = ""
+        i, j = x - step_x, y - step_y
+        while i >= 0 and j >= 0 and self.get_tile(i, j).value:
+            tile = self.get_tile(i, j)
+            prefix = tile.value + prefix
+            if not tile.wild:
+                partial_score += char_scores.get(tile.value, 0)
+            i, j = i - step_x, j - step_y
+
+        suffix = ""
+        i, j = x + step_x, y + step_y
+        while i < self.width and j < self.height and self.get_tile(i, j).value:
+            tile = self.get_tile(i, j)
+            suffix += tile.value
+            if not tile.wild:
+                partial_score += char_scores.get(tile.value, 0)
+            i, j = i + step_x, j + step_y
+
+        if not prefix and not suffix:
+            return prefix, suffix, None
+
+        return prefix, suffix, partial_score
+
+    def compute_cross_check(
+        self, x: int, y: int, horizontal: bool
+    ) -> Tuple[int, Optional[int]]:
+        if self.get_tile(x, y).value:
+            return 0, None
+
+        prefix, suffix, partial_score = self.perpendicular_word(x, y, horizontal)
+
+        if not prefix and not suffix:
+            return ALL_LETTERS, None
+
+        segment = self.lexicon.find(prefix) if prefix else self.lexicon
+
+        if segment is None:
+            return 0, partial_score
+
+        mask = 0
+
+        for char, child in segment.children.items():
+            end = child.find(suffix) if suffix else child
+            if end is not None and end.valid:
+                mask |= letter_bit(char)
+
+        return mask, partial_score
+
+    def prepare_cross_checks(self, lexicon) -> None:
+        """Compute the cross-check masks of every square against `lexicon`.
+
+        Once prepared, `insert` keeps the masks up to date by recomputing
+        only the squares at either end of the words it touches.
+        """
+        if self.lexicon is lexicon:
+            return
+
+        self.lexicon = lexicon
+
+        squares = [(x, y) for y in range(self.height) for x in range(self.width)]
+        horizontal = [self.compute_cross_check(x, y, True) for x, y in squares]
+        vertical = [self.compute_cross_check(x, y, False) for x, y in squares]
+
+        self.horizontal_masks = [i[0] for i in horizontal]
+        self.horizontal_sums = [i[1] for i in horizontal]
+        self.vertical_masks = [i[0] for i in vertical]
+        self.vertical_sums = [i[1] for i in vertical]
+
+    def cross_check_mask(self, x: int, y: int, horizontal: bool) -> int:
+        masks = self.horizontal_masks if horizontal else self.vertical_masks
+        return masks[y * self.width + x]
+
+    def cross_score(self, x: int, y: int, horizontal: bool) -> Optional[int]:
+        if self.lexicon is None:
+            return self.perpendicular_word(x, y, horizontal)[2]
+
+        sums = self.horizontal_sums if horizontal else self.vertical_sums
+        return sums[y * self.width + x]
+
+    def update_cross_checks(self, x: int, y: int) -> None:
+        index = y * self.width + x
+        self.horizontal_masks[index] = self.vertical_masks[index] = 0
+        self.horizontal_sums[index] = self.vertical_sums[index] = None
+
+        for step_x, step_y in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            i, j = x + step_x, y + step_y
+            while 0 <= i < self.width and 0 <= j < self.height:
+                if not self.get_tile(i, j).value:
+                    horizontal = step_y != 0
+                    masks = self.horizontal_masks if horizontal else self.vertical_masks
+                    sums = self.horizontal_sums if horizontal else self.vertical_sums
+                    index = j * self.width + i
+                    masks[index], sums[index] = self.compute_cross_check(
+                        i, j, horizontal
+                    )
+                    break
+                i, j = i + step_x, j + step_y
+
     def insert(self, placement: Placement) -> None:
         self.reset_crosscheck()
         index = 0
+        placed = []
 
         letters = placement.letters
         x = placement.x
         y = placement.y
 
         while index < len(letters) and x < self.width and y < self.height:
-            tile = self.get_tile(x, y)
-
-            if not tile.value:
+            if not self.get_tile(x, y).value:
                 character = letters[index]
+                self.put(x, y, character)
+                self.zobrist ^= square_key(
+                    y * self.width + x, character.value, character.wild
+                )
                 index += 1
-
-                tile.cross_check = True
-                tile.value = character.value
-                tile.wild = character.wild
+                placed += [(x, y)]
 
             if placement.horizontal:
                 x += 1
             else:
                 y += 1
 
-    def copy(self):
+        if self.lexicon is not None:
+            for i, j in placed:
+                self.update_cross_checks(i, j)
+
+        if self.anchors is not None:
+            self.touched += placed
+
+    def put(self, x: int, y: int, character: Character) -> None:
+        tile = self.get_tile(x, y)
+        tile.cross_check = True
+        tile.value = character.value
+        tile.wild = character.wild
+
+    def is_empty(self) -> bool:
+        return all(i.value is None for i in self.tiles)
+
+    def copy_board(self):
         tiles = list(
             map(lambda i: Tile(i.type, i.value, i.wild, i.cross_check), self.tiles)
         )
         return Grid(self.width, self.height, tiles)
 
+    def copy(self):
+        grid = self.copy_board()
+        grid.zobrist = self.zobrist
+        grid.layout = self.layout
+
+        if self.lexicon is not None:
+            grid.lexicon = self.lexicon
+            grid.horizontal_masks = self.horizontal_masks.copy()
+            grid.vertical_masks = self.vertical_masks.copy()
+            grid.horizontal_sums = self.horizontal_sums.copy()
+            grid.vertical_sums = self.vertical_sums.copy()
+
+        if self.anchors is not None:
+            grid.anchor_lexicon = self.anchor_lexicon
+            grid.anchors = self.anchors.copy()
+            grid.touched = self.touched.copy()
+
+        return grid
+
     def reset_crosscheck(self):
         for x in range(self.width):
             for y in range(self.height):
@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from sortedcontainers import SortedList
+
+from .dawg import Dawg
+from .grid import Grid
+from .placement import Placement, ScoredPlacement
+from .solution_builder import SolutionBuilder
+
+
+# Set in each worker by `initialise_worker`.
+worker_lexicon = None
+worker_gaddag = None
+
+
+def initialise_worker(lexicon_path: str, gaddag_path: Optional[str]) -> None:
+    global worker_lexicon, worker_gaddag  # pylint: disable=global-statement
+
+    worker_lexicon = Dawg.open(lexicon_path)
+    worker_gaddag = Dawg.open(gaddag_path) if gaddag_path else None
+
+
+def solve_part(
+    grid_json: dict, rack: str, top_k: Optional[int], part: int, parts: int
+) -> List[ScoredPlacement]:
+    grid = Grid.from_json(grid_json)
+    solution_builder = SolutionBuilder(grid, worker_lexicon, worker_gaddag)
+    return list(solution_builder.solve(rack, top_k=top_k, part=part, parts=parts))
+
+
+class ParallelSolver:
+    """Split the anchors of a solve across a pool of processes.
+
+    Each worker memory-maps the compiled lexicon files (see `Dawg.open`), so
+    the pool shares one read-only copy of them through the page cache.
+    """
+
+    def __init__(
+        self,
+        lexicon_path: str = "dictionary.dawg",
+        gaddag_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.parts = max_workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.parts,
+            initializer=initialise_worker,
+            initargs=(lexicon_path, gaddag_path),
+        )
+
+    def solve(
+        self, grid: Grid, rack: str, top_k: Optional[int] = None
+    ) -> SortedList[Placement]:
+        if top_k == 0:
+            return SortedList()
+
+        grid_json = grid.json()
+
+        futures = [
+            self.executor.submit(solve_part, grid_json, rack, top_k, part, self.parts)
+            for part in range(self.parts)
+        ]
+
+        placements = [i for future in futures for i in future.result()]
+        placements.sort(key=lambda i: i.score)
+
+        if top_k is not None:
+            placements = placements[-top_k:]
+
+        return SortedList(placements)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args) -> None:
+        self.shutdown()
@@ -70,3 +70,13 @@ class ScoredPlacement(Placement):
 
     def json(self) -> dict:
         return {**super().json(), "score": self.score}
+
+    @staticmethod
+    def from_json(json_object: dict):
+        return ScoredPlacement(
+            json_object["x"],
+            json_object["y"],
+            json_object["horizontal"],
+            [Character.from_json(i) for i in json_object["letters"]],
+            json_object["score"],
+        )
@@ -16,3 +16,7 @@ class Player:
 
     def __lt__(self, other) -> bool:
         return self.name < other.name
+
+    @staticmethod
+    def from_json(json_data: dict):
+        return Player(json_data["name"], "".join(json_data["rack"]), json_data["score"])
@@ -0,0 +1,121 @@
+from typing import Optional, Tuple
+
+from .grid import Grid
+from .placement import Placement
+from .tile import Tile, TileType
+
+# A square is either empty or holds a letter and whether it is a blank.
+Square = Optional[Tuple[str, bool]]
+
+
+class GridSnapshot:
+    """An immutable board that shares its rows with the boards it came from.
+
+    `with_placement` only rebuilds the rows a placement touches, so keeping
+    every position of a game, or of a search, costs a few rows per move
+    rather than a whole `Grid`. The premium square layout is shared by all
+    snapshots of a board.
+    """
+
+    __slots__ = ("width", "height", "types", "rows", "placed")
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        types: Tuple[Tuple[TileType, ...], ...],
+        rows: Tuple[Tuple[Square, ...], ...],
+        placed: Tuple[Tuple[int, int], ...] = (),
+    ):
+        self.width = width
+        self.height = height
+        self.types = types
+        self.rows = rows
+        # Squares filled by the placement that made this snapshot.
+        self.placed = placed
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, GridSnapshot)
+            and self.rows == other.rows
+            and self.types == other.types
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.rows)
+
+    def letter(self, x: int, y: int) -> Optional[str]:
+        square = self.rows[y][x]
+        return square[0] if square else None
+
+    def get_tile(self, x: int, y: int) -> Tile:
+        square = self.rows[y][x]
+        return Tile(
+            self.types[y][x],
+            square[0] if square else None,
+            square[1] if square else False,
+            (x, y) in self.placed,
+        )
+
+    def with_placement(self, placement: Placement) -> "GridSnapshot":
+        x, y = placement.x, placement.y
+        rows = {}
+        placed = []
+        index = 0
+
+        while index < len(placement.letters) and x < self.width and y < self.height:
+            row = rows.get(y) or self.rows[y]
+
+            if not row[x]:
+                character = placement.letters[index]
+                index += 1
+
+                row = list(row)
+                row[x] = (character.value, character.wild)
+                rows[y] = tuple(row)
+                placed += [(x, y)]
+
+            if placement.horizontal:
+                x += 1
+            else:
+                y += 1
+
+        new_rows = tuple(rows.get(i, row) for i, row in enumerate(self.rows))
+
+        return GridSnapshot(
+            self.width, self.height, self.types, new_rows, tuple(placed)
+        )
+
+    def to_grid(self) -> Grid:
+        return Grid(
+            self.width,
+            self.height,
+            [
+                self.get_tile(x, y)
+                for y in range(self.height)
+                for x in range(self.width)
+            ],
+        )
+
+    def json(self) -> dict:
+        return self.to_grid().json()
+
+    @staticmethod
+    def from_grid(grid: Grid):
+        types = []
+        rows = []
+        placed = []
+
+        for y in range(grid.height):
+            tiles = [grid.get_tile(x, y) for x in range(grid.width)]
+            types += [tuple(i.type for i in tiles)]
+            rows += [tuple((i.value, i.wild) if i.value else None for i in tiles)]
+            placed += [(x, y) for x, i in enumerate(tiles) if i.cross_check]
+
+        return GridSnapshot(
+            grid.width, grid.height, tuple(types), tuple(rows), tuple(placed)
+        )
+
+    @staticmethod
+    def from_json(json_data: dict):
+        return GridSnapshot.from_grid(Grid.from_json(json_data))
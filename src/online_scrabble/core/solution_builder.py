@@ -1,57 +1,92 @@
-from typing import List
+import heapq
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
 
 from sortedcontainers import SortedList
 
 from .anchor import Anchor, calculate_anchors
-from .character import Character
-from .grid import Grid
+from .bag import WILD_LETTER
+from .character import char_scores, Character
+from .dawg import Dawg
+from .gaddag import SEPARATOR
+from .grid import Grid, letter_bit
 from .placement import Placement, ScoredPlacement
-from .rack import find_in_rack
+from .rack import BLANK_SLOT, count_rack
+from .stats import SolverStats
 from .tile import TileType
 from .trie import Trie
 
 
-char_scores = {
-    "A": 1,
-    "B": 4,
-    "C": 4,
-    "D": 2,
-    "E": 1,
-    "F": 4,
-    "G": 3,
-    "H": 3,
-    "I": 1,
-    "J": 10,
-    "K": 5,
-    "L": 2,
-    "M": 4,
-    "N": 2,
-    "O": 1,
-    "P": 4,
-    "Q": 10,
-    "R": 1,
-    "S": 1,
-    "T": 1,
-    "U": 2,
-    "V": 5,
-    "W": 4,
-    "X": 8,
-    "Y": 3,
-    "Z": 10,
-}
+# Character codes of the letters that may be laid on the board.
+LETTER_CODES = range(ord("A"), ord("Z") + 1)
+
+
+class PlacementError(Exception):
+    pass
+
+
+class GaddagLine:
+    """One row or column of the board, prepared for `gaddag_anchor`.
+
+    `board` holds the character code on each square, or 0, and `masks` the
+    cross-check bits of each square shifted to line up with character codes.
+    `rack_letters` lists the rack's letters each square allows, for when
+    there are no blanks left to play.
+    """
+
+    def __init__(self, grid: Grid, horizontal: bool, index: int, rack_codes: List[int]):
+        if horizontal:
+            self.squares = [(i, index) for i in range(grid.width)]
+        else:
+            self.squares = [(index, i) for i in range(grid.height)]
+
+        self.horizontal = horizontal
+        last = len(self.squares) - 1
+        board = [grid.get_tile(x, y).value for x, y in self.squares]
+        self.board = board = [ord(i) if i else 0 for i in board]
+
+        # Whether a word may end at each square, leftwards and rightwards.
+        self.left_ends = [i == 0 or not board[i - 1] for i in range(last + 1)]
+        self.right_ends = [i == last or not board[i + 1] for i in range(last + 1)]
+
+        self.masks = [
+            grid.cross_check_mask(x, y, horizontal) << ord("A") for x, y in self.squares
+        ]
+        self.rack_letters = [
+            [i for i in rack_codes if mask >> i & 1] for mask in self.masks
+        ]
 
 
 class SolutionBuilder:
-    def __init__(self, grid: Grid, trie: Trie):
+    def __init__(
+        self,
+        grid: Grid,
+        trie: Trie,
+        gaddag: Optional[Dawg] = None,
+        stats: Optional[SolverStats] = None,
+    ):
         self.grid = grid
         self.trie = trie
+        self.gaddag = gaddag
+        self.stats = stats
         self.placements = SortedList()
 
+        # With `top_k` set, moves are kept as plain tuples in a bounded
+        # min-heap and only the survivors become `ScoredPlacement`s. The
+        # counter breaks ties the way `SortedList` does, by insertion order.
+        self.top_k = None
+        self.heap = []
+        self.move_count = 0
+
+        # The two-phase generator works on rack letter counts (see
+        # `count_rack`) and one shared buffer of (letter, blank) pairs, which
+        # only become `Character`s when a move is found.
+        self.counts = []
+        self.word = []
+
     def cross_check(self, x: int, y: int, horizontal: bool, char: str) -> bool:
-        grid_copy = self.grid.copy()
-        grid_copy.get_tile(x, y).value = char
-        word = grid_copy.get_word(x, y, not horizontal)
-        return len(word) == 1 or self.trie.contains(word)
+        return self.grid.cross_check_mask(x, y, horizontal) & letter_bit(char) != 0
 
     def score(
         self, grid: Grid, x: int, y: int, horizontal: bool, recursive: bool = True
@@ -117,13 +152,167 @@ class SolutionBuilder:
 
         return 0
 
-    def legal_move(
-        self,
-        letters: List[Character],
-        anchor: Anchor,
-        horizontal: bool,
-        limit: int,
-    ):
+    def score_move(
+        self, x: int, y: int, horizontal: bool, letters: List[Character]
+    ) -> int:
+        """Score placing `letters` from (x, y) without touching the grid.
+
+        Gives the same result as `score` on a copy of the grid with the move
+        inserted, using the cross-word sums kept by `Grid.prepare_cross_checks`.
+        """
+        grid = self.grid
+        step_x, step_y = (1, 0) if horizontal else (0, 1)
+
+        while (
+            x >= step_x and y >= step_y and grid.get_tile(x - step_x, y - step_y).value
+        ):
+            x -= step_x
+            y -= step_y
+
+        adjacent_score = 0
+        new_tile_count = 0
+        tile_count = 0
+        word_multiplier = 1
+        word_score = 0
+
+        while x < grid.width and y < grid.height:
+            tile = grid.get_tile(x, y)
+
+            if tile.value:
+                if not tile.wild:
+                    word_score += char_scores.get(tile.value, 0)
+            elif new_tile_count < len(letters):
+                character = letters[new_tile_count]
+
+                tile_multiplier = 1
+                cross_multiplier = 1
+
+                if tile.type == TileType.DOUBLE_LETTER:
+                    tile_multiplier = 2
+                elif tile.type == TileType.TRIPPLE_LETTER:
+                    tile_multiplier = 3
+                elif tile.type == TileType.DOUBLE_WORD:
+                    word_multiplier = cross_multiplier = 2
+                elif tile.type == TileType.TRIPPLE_WORD:
+                    word_multiplier = cross_multiplier = 3
+
+                letter_score = 0
+
+                if not character.wild:
+                    letter_score = tile_multiplier * char_scores.get(character.value, 0)
+
+                word_score += letter_score
+
+                cross_score = grid.cross_score(x, y, horizontal)
+
+                if cross_score is not None:
+                    adjacent_score += (cross_score + letter_score) * cross_multiplier
+
+                new_tile_count += 1
+            else:
+                break
+
+            tile_count += 1
+            x += step_x
+            y += step_y
+
+        if new_tile_count > 0 and tile_count > 1:
+            word_score *= word_multiplier
+            word_score += adjacent_score
+
+            if new_tile_count >= 7:
+                word_score += 35
+
+            return word_score
+
+        return 0
+
+    def validate(self, rack: str, placement: Placement) -> ScoredPlacement:
+        """Check and score a single placement without generating moves."""
+        grid = self.grid
+        letters = placement.letters
+        horizontal = placement.horizontal
+        x = placement.x
+        y = placement.y
+
+        if not letters:
+            raise PlacementError("The placement has no letters.")
+
+        for letter in letters:
+            if len(letter.value) != 1 or not "A" <= letter.value <= "Z":
+                raise PlacementError(f"{letter.value!r} is not a letter.")
+
+        available = Counter(rack)
+        required = Counter(WILD_LETTER if i.wild else i.value for i in letters)
+
+        if required - available:
+            raise PlacementError("Those letters are not in your rack.")
+
+        if not (0 <= x < grid.width and 0 <= y < grid.height):
+            raise PlacementError("The placement is outside the board.")
+
+        if grid.get_tile(x, y).value:
+            raise PlacementError("The placement must start on an empty square.")
+
+        placed = {}
+        i, j = x, y
+
+        while len(placed) < len(letters):
+            if i >= grid.width or j >= grid.height:
+                raise PlacementError("The placement does not fit on the board.")
+            if not grid.get_tile(i, j).value:
+                placed[(i, j)] = letters[len(placed)].value
+            if horizontal:
+                i += 1
+            else:
+                j += 1
+
+        def letter_at(i: int, j: int) -> Optional[str]:
+            if not (0 <= i < grid.width and 0 <= j < grid.height):
+                return None
+            return placed.get((i, j)) or grid.get_tile(i, j).value
+
+        def word_through(i: int, j: int, horizontal: bool) -> str:
+            step_x, step_y = (1, 0) if horizontal else (0, 1)
+            while letter_at(i - step_x, j - step_y):
+                i, j = i - step_x, j - step_y
+            word = ""
+            while letter_at(i, j):
+                word += letter_at(i, j)
+                i, j = i + step_x, j + step_y
+            return word
+
+        # A single tile may be submitted in either direction, so score it
+        # along the one it actually makes a word in.
+        if len(letters) == 1 and len(word_through(x, y, horizontal)) == 1:
+            horizontal = not horizontal
+
+        if grid.is_empty():
+            centre = (int(grid.width / 2), int(grid.height / 2))
+            if centre not in placed:
+                raise PlacementError("The first placement must cover the centre.")
+        elif not any(
+            (i + step_x, j + step_y) not in placed and letter_at(i + step_x, j + step_y)
+            for i, j in placed
+            for step_x, step_y in ((-1, 0), (1, 0), (0, -1), (0, 1))
+        ):
+            raise PlacementError("The placement must touch a tile on the board.")
+
+        words = [word_through(x, y, horizontal)]
+        words += [word_through(i, j, not horizontal) for i, j in placed]
+
+        for word in words:
+            if len(word) > 1 and not self.trie.contains(word):
+                raise PlacementError(f"{word} is not a word.")
+
+        if len(words[0]) == 1:
+            raise PlacementError("The placement does not make a word.")
+
+        score = self.score_move(x, y, horizontal, letters)
+
+        return ScoredPlacement(x, y, horizontal, letters, score)
+
+    def legal_move(self, anchor: Anchor, horizontal: bool, limit: int):
         insert_x = anchor.x
         insert_y = anchor.y
 
@@ -132,22 +321,65 @@ class SolutionBuilder:
         else:
             insert_y -= anchor.y_length - limit
 
-        grid_copy = self.grid.copy()
+        letters = [Character(char, wild) for char, wild in self.word]
+        self.add_move(insert_x, insert_y, horizontal, letters)
 
-        placement = Placement(insert_x, insert_y, horizontal, letters)
+    def take_from_rack(self, char: str) -> Optional[int]:
+        """Remove `char`, or else a blank, from the rack counts.
 
-        grid_copy.insert(placement)
+        Returns the slot that was used so it can be handed back, or None if
+        the rack has neither.
+        """
+        slot = ord(char) - ord("A")
 
-        score = self.score(grid_copy, anchor.x, anchor.y, horizontal)
+        if self.counts[slot] <= 0:
+            slot = BLANK_SLOT
+            if self.counts[slot] <= 0:
+                return None
 
-        self.placements += [
-            ScoredPlacement(insert_x, insert_y, horizontal, letters, score)
-        ]
+        self.counts[slot] -= 1
+        self.word.append((char, slot == BLANK_SLOT))
+        return slot
+
+    def return_to_rack(self, slot: int) -> None:
+        self.counts[slot] += 1
+        self.word.pop()
+
+    def add_move(
+        self, x: int, y: int, horizontal: bool, letters: List[Character]
+    ) -> None:
+        stats = self.stats
+
+        if stats is None:
+            score = self.score_move(x, y, horizontal, letters)
+            self.keep_move(x, y, horizontal, letters, score)
+            return
+
+        stats.moves += 1
+        start = time.perf_counter()
+        score = self.score_move(x, y, horizontal, letters)
+        scored = time.perf_counter()
+        self.keep_move(x, y, horizontal, letters, score)
+        stats.scoring_time += scored - start
+        stats.sorting_time += time.perf_counter() - scored
+
+    def keep_move(
+        self, x: int, y: int, horizontal: bool, letters: List[Character], score: int
+    ) -> None:
+        if self.top_k is None:
+            self.placements += [ScoredPlacement(x, y, horizontal, letters, score)]
+            return
+
+        self.move_count += 1
+        move = (score, self.move_count, x, y, horizontal, letters)
+
+        if len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, move)
+        elif score >= self.heap[0][0]:
+            heapq.heapreplace(self.heap, move)
 
     def extend_right(
         self,
-        rack: str,
-        word: List[Character],
         segment: Trie,
         anchor: Anchor,
         horizontal: bool,
@@ -155,7 +387,15 @@ class SolutionBuilder:
         y: int,
         limit: int,
     ) -> None:
-        edge = x >= self.grid.width - 1 or y >= self.grid.height - 1
+        stats = self.stats
+
+        if stats is not None:
+            stats.nodes += 1
+
+        if horizontal:
+            edge = x >= self.grid.width - 1
+        else:
+            edge = y >= self.grid.height - 1
 
         if not edge:
             if horizontal:
@@ -167,101 +407,292 @@ class SolutionBuilder:
 
         if not tile_value or edge:
             if segment.valid:
-                self.legal_move(word, anchor, horizontal, limit)
+                self.legal_move(anchor, horizontal, limit)
             if edge:
                 return
-            for child in segment.children:
-                character, rack_copy = find_in_rack(rack, child)
-                if not character:
+
+            mask = self.grid.cross_check_mask(x, y, horizontal)
+
+            for child, value in segment.children.items():
+                if stats is not None:
+                    stats.cross_checks += 1
+                    stats.cross_check_rejections += not mask & letter_bit(child)
+
+                if not mask & letter_bit(child):
                     continue
 
-                if self.cross_check(x, y, horizontal, character.value):
-                    word_copy = word.copy() + [character]
-
-                    self.extend_right(
-                        rack_copy,
-                        word_copy,
-                        segment.children[child],
-                        anchor,
-                        horizontal,
-                        x,
-                        y,
-                        limit,
-                    )
+                slot = self.take_from_rack(child)
+                if slot is None:
+                    continue
+
+                self.extend_right(value, anchor, horizontal, x, y, limit)
+                self.return_to_rack(slot)
         else:
             segment_continue = segment.find(tile_value)
 
             if segment_continue:
-                self.extend_right(
-                    rack, word, segment_continue, anchor, horizontal, x, y, limit
-                )
+                self.extend_right(segment_continue, anchor, horizontal, x, y, limit)
 
     def left_part(
         self,
-        rack: str,
-        word: List[Character],
         segment: Trie,
         anchor: Anchor,
         horizontal: bool,
         limit: int,
     ):
-        if self.cross_check(anchor.x, anchor.y, horizontal, segment.value):
-            self.extend_right(
-                rack, word, segment, anchor, horizontal, anchor.x, anchor.y, limit
-            )
+        allowed = self.cross_check(anchor.x, anchor.y, horizontal, segment.value)
+
+        if self.stats is not None:
+            self.stats.nodes += 1
+            self.stats.cross_checks += 1
+            self.stats.cross_check_rejections += not allowed
+
+        if allowed:
+            self.extend_right(segment, anchor, horizontal, anchor.x, anchor.y, limit)
 
         if limit > 0:
             for child, value in segment.children.items():
-                character, rack_copy = find_in_rack(rack, child)
-
-                if not character:
+                slot = self.take_from_rack(child)
+                if slot is None:
                     continue
 
-                word_copy = word.copy() + [character]
+                self.left_part(value, anchor, horizontal, limit - 1)
+                self.return_to_rack(slot)
+
+    def gaddag_anchor(
+        self,
+        counts: List[int],
+        blanks: int,
+        line: GaddagLine,
+        start: int,
+        anchor_squares: Set[Tuple[int, int]],
+    ) -> None:
+        """Generate every move through square `start` of `line` by walking the GADDAG.
+
+        Letters are laid from the anchor leftwards, then the separator edge
+        switches to the squares right of the anchor. Moving left stops at
+        other anchors, so a move is only found from the leftmost anchor it
+        covers, just as `left_part` limits itself. `counts` is indexed by
+        character code.
+        """
+        gaddag = self.gaddag
+        cache = gaddag.code_edges
+        expand = gaddag.code_children
+        terminal = gaddag.terminal
+        separator_code = ord(SEPARATOR)
+
+        squares = line.squares
+        horizontal = line.horizontal
+        board = line.board
+        last = len(squares) - 1
+        left_ends = line.left_ends
+        right_ends = line.right_ends
+        rack_letters = line.rack_letters
+        masks = line.masks
+        # Whether moving left may go on past each square.
+        left_open = [
+            i > 0 and (board[i - 1] or squares[i - 1] not in anchor_squares)
+            for i in range(last + 1)
+        ]
+        right_free = right_ends[start]
+        can_turn = start < last
+        rack_counts = counts.copy()
+        rack_blanks = blanks
+        placed = [0] * len(squares)
+        # The square the word starts on, once it turns rightwards.
+        left = start
+        stats = self.stats
+
+        def record(first: int, end: int) -> None:
+            characters = [Character(chr(i), False) for i in placed[first:end] if i]
+
+            if blanks < rack_blanks:
+                # Blanks are given to letters the way `take_from_rack` would,
+                # left to right, so both engines produce the same placements.
+                remaining = rack_counts.copy()
+                for character in characters:
+                    code = ord(character.value)
+                    character.wild = remaining[code] <= 0
+                    remaining[code] -= 1
+
+            while not placed[first]:
+                first += 1
+
+            x, y = squares[first]
+            self.add_move(x, y, horizontal, characters)
+
+        def edges(node: int) -> Dict[int, int]:
+            children = cache.get(node)
+            return expand(node) if children is None else children
+
+        def go_on(i: int, target: int, leftward: bool) -> None:
+            nonlocal left
+
+            if leftward:
+                if terminal[target] and left_ends[i] and right_free:
+                    record(i, start + 1)
+
+                if left_open[i] or left_ends[i] and can_turn:
+                    children = edges(target)
+
+                    if left_open[i]:
+                        go(i - 1, children, True)
+
+                    # The separator sorts before every letter, so it is never
+                    # laid on the board as one.
+                    if left_ends[i] and can_turn and separator_code in children:
+                        left = i
+                        go(start + 1, edges(children[separator_code]), False)
+            else:
+                if terminal[target] and right_ends[i]:
+                    record(left, i + 1)
+                if i < last:
+                    go(i + 1, edges(target), False)
+
+        def go(i: int, children: Dict[int, int], leftward: bool) -> None:
+            """Lay each letter that `children` allows on square `i`."""
+            nonlocal blanks
 
-                self.left_part(
-                    rack_copy,
-                    word_copy,
-                    value,
-                    anchor,
-                    horizontal,
-                    limit - 1,
-                )
+            if stats is not None:
+                stats.nodes += 1
 
-    def solve(self, rack: str) -> SortedList[Placement]:
-        self.placements = SortedList()
+            fixed = board[i]
+
+            if fixed:
+                target = children.get(fixed)
+                if target is not None:
+                    go_on(i, target, leftward)
+                return
+
+            mask = masks[i]
+
+            if blanks:
+                for code, target in children.items():
+                    if not mask >> code & 1:
+                        continue
+
+                    placed[i] = code
+
+                    if counts[code] > 0:
+                        counts[code] -= 1
+                        go_on(i, target, leftward)
+                        counts[code] += 1
+                    else:
+                        blanks -= 1
+                        go_on(i, target, leftward)
+                        blanks += 1
+            else:
+                # Without blanks only the rack's letters can be laid, which
+                # are fewer than the edges of most nodes.
+                for code in rack_letters[i]:
+                    if counts[code] > 0 and code in children:
+                        placed[i] = code
+                        counts[code] -= 1
+                        go_on(i, children[code], leftward)
+                        counts[code] += 1
+
+            placed[i] = 0
 
-        anchors = calculate_anchors(self.grid, self.trie)
+            if stats is not None:
+                stats.cross_checks += len(children)
+                stats.cross_check_rejections += sum(not mask >> j & 1 for j in children)
+
+        go(start, edges(0), True)
+
+    def gaddag_solve(
+        self, rack: str, anchors: List[Anchor], anchor_squares: Set[Tuple[int, int]]
+    ) -> None:
+        counts = [rack.count(chr(i)) for i in range(128)]
+        blanks = rack.count(WILD_LETTER)
+        rack_codes = [i for i in LETTER_CODES if counts[i]]
+        lines = {}
 
         for anchor in anchors:
-            for key, value in anchor.x_trie.children.items():
-                character, rack_copy = find_in_rack(rack, key)
+            for horizontal, index, start in (
+                (True, anchor.y, anchor.x),
+                (False, anchor.x, anchor.y),
+            ):
+                line = lines.get((horizontal, index))
+                if line is None:
+                    line = lines[horizontal, index] = GaddagLine(
+                        self.grid, horizontal, index, rack_codes
+                    )
 
-                if not character:
-                    continue
+                self.gaddag_anchor(counts, blanks, line, start, anchor_squares)
+
+    def solve(
+        self,
+        rack: str,
+        top_k: Optional[int] = None,
+        best_only: bool = False,
+        part: int = 0,
+        parts: int = 1,
+    ) -> SortedList[Placement]:
+        """Find every legal move for `rack`, lowest score first.
+
+        `top_k` keeps only the highest scoring moves and `best_only` keeps
+        just the best one; either way the result is the tail of the full
+        list. `part` and `parts` restrict the search to every `parts`-th
+        anchor, so that several processes can share one solve.
+        """
+        self.placements = SortedList()
+        self.top_k = 1 if best_only else top_k
+        self.heap = []
+        self.move_count = 0
+        stats = self.stats
 
-                self.left_part(
-                    rack_copy,
-                    [character],
-                    value,
-                    anchor,
-                    True,
-                    anchor.x_length,
-                )
+        if stats is not None:
+            stats.solves += 1
+            start = time.perf_counter()
+            scoring_time = stats.scoring_time
+            sorting_time = stats.sorting_time
 
-            for key, value in anchor.y_trie.children.items():
-                character, rack_copy = find_in_rack(rack, key)
+        self.grid.prepare_cross_checks(self.trie)
 
-                if not character:
-                    continue
+        all_anchors = calculate_anchors(self.grid, self.trie)
+        anchors = all_anchors[part::parts]
+
+        if stats is not None:
+            stats.anchors += len(anchors)
+            searching = time.perf_counter()
+            stats.anchor_time += searching - start
+
+        if self.gaddag is not None:
+            self.gaddag_solve(rack, anchors, {(i.x, i.y) for i in all_anchors})
+        else:
+            self.counts = count_rack(rack)
+            self.word = []
+
+            for anchor in anchors:
+                for trie, horizontal, limit in (
+                    (anchor.x_trie, True, anchor.x_length),
+                    (anchor.y_trie, False, anchor.y_length),
+                ):
+                    for key, value in trie.children.items():
+                        slot = self.take_from_rack(key)
+                        if slot is None:
+                            continue
+
+                        self.left_part(value, anchor, horizontal, limit)
+                        self.return_to_rack(slot)
+
+        if stats is not None:
+            sorting = time.perf_counter()
+            stats.search_time += (
+                sorting
+                - searching
+                - (stats.scoring_time - scoring_time)
+                - (stats.sorting_time - sorting_time)
+            )
+
+        if self.top_k is not None:
+            self.placements = SortedList(
+                ScoredPlacement(x, y, horizontal, letters, score)
+                for score, _count, x, y, horizontal, letters in sorted(self.heap)
+            )
+            self.heap = []
 
-                self.left_part(
-                    rack_copy,
-                    [character],
-                    value,
-                    anchor,
-                    False,
-                    anchor.y_length,
-                )
+        if stats is not None:
+            stats.sorting_time += time.perf_counter() - sorting
 
         return self.placements
@@ -0,0 +1,132 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sortedcontainers import SortedList
+
+from .dawg import Dawg
+from .grid import Grid
+from .placement import Placement
+from .solution_builder import SolutionBuilder
+from .stats import SolverStats
+from .trie import Trie
+
+
+def placements_size(placements: SortedList) -> int:
+    """Rough number of bytes held by a list of scored placements."""
+    size = sys.getsizeof(placements)
+
+    for placement in placements:
+        size += sys.getsizeof(placement) + sys.getsizeof(placement.__dict__)
+        size += sys.getsizeof(placement.letters)
+        size += sum(sys.getsizeof(i) for i in placement.letters)
+
+    return size
+
+
+class SolveCache:
+    """Least recently used cache of `SolutionBuilder.solve` results.
+
+    Results are keyed by the Zobrist hash of the board (see `Grid.zobrist`),
+    its size and premium squares (see `Grid.layout_key`), the sorted rack and
+    `top_k`, so a grid that has been inserted into no longer finds the
+    results of its earlier position. Misses are solved on a copy of the
+    grid, so the caller's grid is never changed. The cache holds at most
+    `max_entries` results and roughly `max_bytes` of placements.
+
+    The returned lists are shared between callers and must not be modified.
+    The cache may be used from several threads; solves run outside its lock,
+    so two threads missing on one key both solve it. Misses are solved by
+    `run(function, *args)`, which calls `function` directly by default.
+    """
+
+    def __init__(
+        self,
+        lexicon: Trie,
+        gaddag: Optional[Dawg] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        run: Optional[Callable] = None,
+    ):
+        self.lexicon = lexicon
+        self.gaddag = gaddag
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.run = run or (lambda function, *args: function(*args))
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def json(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def solve(
+        self,
+        grid: Grid,
+        rack: str,
+        top_k: Optional[int] = None,
+        stats: Optional[SolverStats] = None,
+    ) -> SortedList[Placement]:
+        key = (
+            grid.zobrist,
+            grid.width,
+            grid.height,
+            grid.layout_key(),
+            "".join(sorted(rack)),
+            top_k,
+        )
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[0]
+
+            self.misses += 1
+
+        solution_builder = SolutionBuilder(
+            grid.copy(), self.lexicon, self.gaddag, stats
+        )
+        placements = self.run(solution_builder.solve, rack, top_k)
+        size = placements_size(placements)
+
+        if size > self.max_bytes:
+            return placements
+
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+
+            self.entries[key] = (placements, size)
+            self.size += size
+
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _key, (_placements, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+        return placements
+
+    def discard(self, board_hash: int) -> None:
+        """Drop every result for the board with Zobrist hash `board_hash`."""
+        with self.lock:
+            for key in [i for i in self.entries if i[0] == board_hash]:
+                self.size -= self.entries.pop(key)[1]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
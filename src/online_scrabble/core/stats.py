@@ -0,0 +1,36 @@
+class SolverStats:
+    """Counters and phase timings of `SolutionBuilder.solve`.
+
+    Pass one to a `SolutionBuilder` to have its solves add to it; without
+    one the solver does no counting or timing at all. Times are in seconds.
+    `anchor_time` covers preparing cross-checks and finding anchors, and
+    `search_time` is move generation excluding `scoring_time` and
+    `sorting_time`.
+    """
+
+    def __init__(self):
+        self.solves = 0
+        self.anchors = 0
+        self.nodes = 0
+        self.cross_checks = 0
+        self.cross_check_rejections = 0
+        self.moves = 0
+
+        self.anchor_time = 0.0
+        self.search_time = 0.0
+        self.scoring_time = 0.0
+        self.sorting_time = 0.0
+
+    def json(self) -> dict:
+        return dict(vars(self))
+
+    def __str__(self) -> str:
+        return (
+            f"{self.solves} solves, {self.anchors} anchors, {self.nodes} nodes, "
+            f"{self.cross_checks} cross-checks "
+            f"({self.cross_check_rejections} rejected), {self.moves} moves; "
+            f"anchors {self.anchor_time * 1000:.1f}ms, "
+            f"search {self.search_time * 1000:.1f}ms, "
+            f"scoring {self.scoring_time * 1000:.1f}ms, "
+            f"sorting {self.sorting_time * 1000:.1f}ms"
+        )
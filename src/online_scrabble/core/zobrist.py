@@ -0,0 +1,47 @@
+import random
+from typing import List
+
+from .rack import BLANK_SLOT, count_rack
+
+SEED = 0x5C4ABB1E
+
+# Keys are drawn from fixed seeds as they are first needed, always in the
+# same order, so hashes are the same in every process and on every run.
+square_random = random.Random(SEED)
+rack_random = random.Random(SEED + 1)
+
+# 52 keys per square, one for each letter as a tile and as a blank.
+square_keys: List[List[int]] = []
+
+# Keys for having 1, 2, ... of each rack slot (see `count_rack`).
+rack_keys: List[List[int]] = [[] for _ in range(BLANK_SLOT + 1)]
+
+
+def square_key(index: int, letter: str, wild: bool) -> int:
+    """Key of `letter` on the square `index` (y * width + x) of a board."""
+    while len(square_keys) <= index:
+        square_keys.append([square_random.getrandbits(64) for _ in range(52)])
+    return square_keys[index][(ord(letter) - ord("A")) * 2 + wild]
+
+
+def rack_key(slot: int, count: int) -> int:
+    keys = rack_keys[slot]
+    while len(keys) < count:
+        keys.append(rack_random.getrandbits(64))
+    return keys[count - 1]
+
+
+def rack_hash(rack: str) -> int:
+    """Hash of the letters in `rack`, regardless of their order."""
+    result = 0
+
+    for slot, count in enumerate(count_rack(rack)):
+        for i in range(1, count + 1):
+            result ^= rack_key(slot, i)
+
+    return result
+
+
+def position_hash(grid, rack: str) -> int:
+    """Hash of a board together with the rack that is to move on it."""
+    return grid.zobrist ^ rack_hash(rack)
@@ -0,0 +1,62 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from online_scrabble.core import Bag, Grid, SolutionBuilder, Trie
+from online_scrabble.core.rack import populate_rack, remove_letters_from_rack
+
+# Stops a game whose players keep finding moves, which should not happen.
+MAX_MOVES = 200
+
+
+@dataclass
+class GameResult:
+    seed: int
+    scores: List[int]
+    moves: int = 0
+    passes: int = 0
+    solve_times: List[float] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def play_game(seed: int, lexicon: Trie, players: int = 2) -> GameResult:
+    """Play a game between best-move players, with the bag drawn from `seed`.
+
+    As on the server, the game ends when a player empties their rack, and
+    also when every player in a row has no move, since there is no passing
+    or exchanging there. `solve_times` holds the seconds taken by each solve.
+    """
+    start = time.perf_counter()
+    bag = Bag.new(random.Random(seed))
+    grid = Grid.large()
+    racks = [populate_rack("", bag) for _ in range(players)]
+    result = GameResult(seed, [0] * players)
+    passes_in_a_row = 0
+    turn = 0
+
+    while passes_in_a_row < players and result.moves < MAX_MOVES:
+        solve_start = time.perf_counter()
+        placements = SolutionBuilder(grid, lexicon).solve(racks[turn], best_only=True)
+        result.solve_times += [time.perf_counter() - solve_start]
+
+        if len(placements) == 0:
+            result.passes += 1
+            passes_in_a_row += 1
+        else:
+            placement = placements[-1]
+            grid.insert(placement)
+            result.scores[turn] += placement.score
+            result.moves += 1
+            passes_in_a_row = 0
+
+            rack = remove_letters_from_rack(racks[turn], placement.letters)
+            racks[turn] = populate_rack(rack, bag)
+
+            if len(racks[turn]) == 0:
+                break
+
+        turn = (turn + 1) % players
+
+    result.duration = time.perf_counter() - start
+    return result
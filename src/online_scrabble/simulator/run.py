@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from online_scrabble.core import Dawg
+from online_scrabble.simulator.game import GameResult, play_game
+
+# Set in each worker by `initialise_worker`.
+worker_lexicon = None
+worker_players = None
+
+
+def initialise_worker(
+    lexicon_path: str, dictionary_path: Optional[str], players: int
+) -> None:
+    global worker_lexicon, worker_players  # pylint: disable=global-statement
+
+    if dictionary_path:
+        worker_lexicon = Dawg.load(dictionary_path)
+    else:
+        worker_lexicon = Dawg.open(lexicon_path)
+
+    worker_players = players
+
+
+def play_seed(seed: int) -> GameResult:
+    return play_game(seed, worker_lexicon, worker_players)
+
+
+def distribution(values: List[float]) -> dict:
+    if not values:
+        return {}
+
+    if len(values) == 1:
+        cuts = values * 99
+    else:
+        cuts = statistics.quantiles(values, n=100, method="inclusive")
+
+    return {
+        "min": min(values),
+        "mean": statistics.fmean(values),
+        "p50": cuts[49],
+        "p90": cuts[89],
+        "p99": cuts[98],
+        "max": max(values),
+    }
+
+
+def summarise(results: List[GameResult], elapsed: float) -> dict:
+    moves = sum(i.moves for i in results)
+    scores = [j for i in results for j in i.scores]
+    margins = [max(i.scores) - min(i.scores) for i in results]
+    solve_times = [j for i in results for j in i.solve_times]
+
+    return {
+        "games": len(results),
+        "seconds": elapsed,
+        "games_per_second": len(results) / elapsed if elapsed else 0.0,
+        "moves_per_second": moves / elapsed if elapsed else 0.0,
+        "moves_per_game": moves / len(results) if results else 0.0,
+        "passes": sum(i.passes for i in results),
+        "score": distribution(scores),
+        "winning_margin": distribution(margins),
+        "solve_time": distribution(solve_times),
+    }
+
+
+def simulate(
+    games: int,
+    seed: int = 0,
+    players: int = 2,
+    processes: Optional[int] = None,
+    lexicon_path: str = "dictionary.dawg",
+    dictionary_path: Optional[str] = None,
+) -> dict:
+    """Play `games` games with seeds from `seed` on and summarise them.
+
+    The workers open the compiled lexicon at `lexicon_path`, or build one
+    from the word list at `dictionary_path` if it is given. Each game
+    depends on its seed only, so the summary other than the timings is the
+    same for any number of `processes`.
+    """
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=initialise_worker,
+        initargs=(lexicon_path, dictionary_path, players),
+    ) as executor:
+        seeds = range(seed, seed + games)
+        results = list(executor.map(play_seed, seeds, chunksize=4))
+
+    return summarise(results, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Play games between best-move players without the server."
+    )
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game.")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--lexicon", default="dictionary.dawg")
+    parser.add_argument(
+        "--dictionary", help="Word list to use instead of the compiled --lexicon."
+    )
+    parser.add_argument("--output", help="Write the summary here, not to stdout.")
+    args = parser.parse_args()
+
+    summary = simulate(
+        args.games,
+        args.seed,
+        args.players,
+        args.processes,
+        args.lexicon,
+        args.dictionary,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(summary, output, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
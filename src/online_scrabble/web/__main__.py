@@ -1,18 +1,26 @@
+import os
 import random
+from typing import Callable, List, Optional, TypeVar
 
-from flask import abort, Flask
+from flask import abort, Flask, make_response, request
 from flask_login import current_user, LoginManager
-from flask_restx import Api, fields, marshal, Resource
+from flask_restx import Api, fields, marshal, reqparse, Resource
+from gevent import get_hub
+from gevent.monkey import is_module_patched
 
 from online_scrabble.core import (
+    load_lexicon,
     Placement,
     Player,
     ScoredPlacement,
-    Trie,
+    SolveCache,
+    SolverStats,
 )
 from online_scrabble.web.decorators import api_login_required
+from online_scrabble.web.event_log import EventLog
 from online_scrabble.web.game import Game, GameError
 from online_scrabble.web.login import create_request_loader, create_unauthorized_handler
+from online_scrabble.web.store import MemoryGameStore, SqliteGameStore, StoreError
 
 
 app = Flask(__name__)
@@ -34,8 +42,38 @@ login_manager.init_app(app)
 create_request_loader(login_manager)
 create_unauthorized_handler(login_manager)
 
-dictionary = Trie.load("dictionary.txt")
-game_map = {}
+T = TypeVar("T")
+
+
+def run_off_hub(function: Callable[..., T], *args) -> T:
+    """Call `function` on gevent's thread pool when serving from greenlets.
+
+    A solve takes up to seconds of CPU, during which the hub could not serve
+    any other request. On a thread, the GIL still lets the hub run between
+    the solve's switch intervals.
+    """
+    if is_module_patched("threading"):
+        return get_hub().threadpool.apply(function, args)
+    return function(*args)
+
+
+dictionary = load_lexicon()
+solve_cache = SolveCache(dictionary, run=run_off_hub)
+
+# Set SCRABBLE_DATABASE to share games between workers through SQLite, or
+# SCRABBLE_EVENT_LOG to a directory to keep one worker's games across restarts.
+if os.environ.get("SCRABBLE_DATABASE"):
+    game_store = SqliteGameStore(os.environ["SCRABBLE_DATABASE"])
+elif os.environ.get("SCRABBLE_EVENT_LOG"):
+    game_store = MemoryGameStore(EventLog(os.environ["SCRABBLE_EVENT_LOG"]))
+else:
+    game_store = MemoryGameStore()
+
+HINT_COUNT = 5
+
+# Seconds a stream request waits for a change before answering without one.
+STREAM_TIMEOUT = 25
+MAX_STREAM_TIMEOUT = 60
 
 
 game_id_description = "Game ID."
@@ -129,6 +167,39 @@ model_game = api.model(
     },
 )
 
+model_event = api.model(
+    "Event",
+    {
+        "version": fields.Integer(required=True),
+        "type": fields.String(enum=["join", "start", "placement"], required=True),
+        "player": fields.String(required=True),
+        "placement": fields.Nested(model_scored_placement, allow_null=True),
+    },
+)
+
+model_events = api.model(
+    "Events",
+    {
+        "version": fields.String(required=True),
+        "state": fields.String(
+            enum=["waiting_to_start", "in_progress", "completed"], required=True
+        ),
+        "turn": fields.String(),
+        "events": fields.List(fields.Nested(model_event, skip_none=True)),
+    },
+)
+
+events_parser = reqparse.RequestParser()
+events_parser.add_argument("since", help="Version the client already has, if any.")
+
+stream_parser = events_parser.copy()
+stream_parser.add_argument(
+    "timeout",
+    type=float,
+    default=STREAM_TIMEOUT,
+    help=f"Seconds to wait for a change, at most {MAX_STREAM_TIMEOUT}.",
+)
+
 model_message = api.model("Message", {"message": fields.String(required=True)})
 
 model_player_state = api.model(
@@ -149,26 +220,37 @@ model_game_and_player_state = api.model(
 
 
 def create_game(id: str) -> None:
-    if game_map.get(id):
-        abort(400, "Game already exists.")
-    game_map[id] = Game.new()
+    try:
+        game_store.create(id, Game.new())
+    except StoreError as error:
+        abort(400, str(error))
 
 
 def get_game(id: str) -> Game:
-    game = game_map.get(id)
+    game = game_store.get(id)
     if not game:
         abort(404, "This game does not exist.")
     return game
 
 
-def place_game(id: str, placement: Placement) -> Player:
-    game = get_game(id)
+def update_game(id: str, change: Callable[[Game], T]) -> T:
+    get_game(id)
 
     try:
-        game.insert(current_user.get_id(), placement, dictionary)
-    except GameError as error:
+        return game_store.update(id, change)
+    except (GameError, StoreError) as error:
         abort(400, str(error))
 
+
+def place_game(id: str, placement: Placement) -> Player:
+    board_hash = get_game(id).grid.zobrist
+
+    update_game(
+        id, lambda game: game.insert(current_user.get_id(), placement, dictionary)
+    )
+
+    solve_cache.discard(board_hash)
+
     return get_player(id)
 
 
@@ -181,26 +263,61 @@ def score_placement(id: str, placement: Placement) -> ScoredPlacement:
         abort(400, str(error))
 
 
-def join_game(id: str) -> Player:
+def hint(id: str) -> List[ScoredPlacement]:
     game = get_game(id)
+    player = get_player(id)
 
-    try:
-        player = game.join(current_user.get_id())
-    except GameError as error:
-        abort(400, str(error))
+    stats = SolverStats()
+    placements = solve_cache.solve(game.grid, player.rack, HINT_COUNT, stats)
 
-    return player
+    if stats.solves:
+        app.logger.info("Hint for %s in %s: %s", player.name, id, stats)
+    else:
+        app.logger.info("Hint for %s in %s: cached", player.name, id)
 
+    return list(reversed(placements))
 
-def start_game(id: str) -> Game:
+
+def check_version(game: Game, since: Optional[str]) -> int:
+    if since is None:
+        return 0
+
+    version = game.version_of(since)
+
+    if version is None:
+        abort(400, f"There is no version {since} of this game.")
+
+    return version
+
+
+def get_events(id: str, since: Optional[str]) -> dict:
     game = get_game(id)
+    version = check_version(game, since)
 
-    try:
-        game.start(current_user.get_id())
-    except GameError as error:
-        abort(400, str(error))
+    return {
+        "version": game.tag,
+        "state": game.state.value,
+        "turn": game.turn,
+        "events": game.public_events(version),
+    }
 
-    return game
+
+def stream_events(id: str, since: Optional[str], timeout: float) -> dict:
+    game = get_game(id)
+
+    if check_version(game, since) == game.version:
+        game_store.wait(id, game.tag, min(max(timeout, 0), MAX_STREAM_TIMEOUT))
+
+    return get_events(id, since)
+
+
+def join_game(id: str) -> Player:
+    return update_game(id, lambda game: game.join(current_user.get_id()))
+
+
+def start_game(id: str) -> Game:
+    update_game(id, lambda game: game.start(current_user.get_id()))
+    return get_game(id)
 
 
 def get_player(id: str) -> Player:
@@ -216,7 +333,7 @@ def get_player(id: str) -> Player:
 
 def delete_game(id: str) -> None:
     get_game(id)
-    game_map[id] = None
+    game_store.delete(id)
 
 
 @game_namespace.route("/<id>")
@@ -236,11 +353,21 @@ class GameResource(Resource):
         create_game(id)
         return {"message": "Game created."}
 
-    @game_namespace.marshal_with(model_game, code=200)
+    @game_namespace.response(200, "Game information.", model_game)
+    @game_namespace.response(304, "The game has not changed since the given ETag.")
     @game_namespace.response(404, "Game does not exist.")
     def get(self, id: str):
         """Get game information."""
-        return get_game(id).json()
+        game = get_game(id)
+        etag = game.tag
+
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(marshal(game.json(), model_game))
+
+        response.set_etag(etag)
+        return response
 
     @api_login_required(api)
     @game_namespace.response(200, "Game was deleted.")
@@ -252,6 +379,35 @@ class GameResource(Resource):
         return {"message": "Success."}
 
 
+@action_namespace.route("/events")
+@action_namespace.param("id", game_id_description)
+class ActionEventsResource(Resource):
+    @action_namespace.expect(events_parser)
+    @action_namespace.response(200, "Events after the given version.", model_events)
+    @action_namespace.response(400, "Unknown version.")
+    @action_namespace.response(404, "Game does not exist.")
+    def get(self, id: str):
+        """Get what happened in a game since a version of it."""
+        args = events_parser.parse_args()
+        return marshal(get_events(id, args["since"]), model_events)
+
+
+@action_namespace.route("/stream")
+@action_namespace.param("id", game_id_description)
+class ActionStreamResource(Resource):
+    @action_namespace.expect(stream_parser)
+    @action_namespace.response(200, "Events after the given version.", model_events)
+    @action_namespace.response(400, "Unknown version.")
+    @action_namespace.response(404, "Game does not exist.")
+    def get(self, id: str):
+        """Wait for a game to change after a version, then get what happened.
+
+        Answers with no events if nothing happens before the timeout.
+        """
+        args = stream_parser.parse_args()
+        return marshal(stream_events(id, args["since"], args["timeout"]), model_events)
+
+
 @action_namespace.route("/join")
 @game_namespace.param("id", game_id_description)
 class ActionJoinResource(Resource):
@@ -336,9 +492,25 @@ class ActionScorePlacement(Resource):
             404: ["Game does not exist.", "Message"],
         }
     )
-    def put(self, id_: str):
+    def put(self, id: str):
         placement = Placement.from_json(api.payload)
-        return marshal(score_placement(id_, placement).json(), model_scored_placement)
+        return marshal(score_placement(id, placement).json(), model_scored_placement)
+
+
+@action_namespace.route("/hint")
+@action_namespace.param("id", game_id_description)
+class ActionHintResource(Resource):
+    @api_login_required(api)
+    @api.doc(
+        responses={
+            200: ["Best placements for the player's rack.", "ScoredPlacement"],
+            400: ["Player not in game.", "Message"],
+            401: ["Unauthorized.", "Message"],
+            404: ["Game does not exist.", "Message"],
+        }
+    )
+    def put(self, id: str):
+        return marshal([i.json() for i in hint(id)], model_scored_placement)
 
 
 if __name__ == "__main__":
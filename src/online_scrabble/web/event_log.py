@@ -0,0 +1,129 @@
+import glob
+import json
+import os
+from typing import Dict, List
+
+from online_scrabble.web.game import Game
+
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+
+
+class EventLog:
+    """Append-only log of game changes with periodic snapshots.
+
+    Each line of the log is one record: a game being created (with its
+    starting state), one of its events (see `Game.apply_event`), or its
+    deletion. Every `snapshot_interval` records the state of every game is
+    written to a snapshot and the log starts again in a new file, so
+    recovering only replays the records written since the last snapshot.
+    """
+
+    def __init__(
+        self, directory: str, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL
+    ):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.records = 0
+        self.generation = 0
+        self.file = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def log_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"events.{generation}.log")
+
+    def recover(self) -> Dict[str, Game]:
+        """Rebuild the games from the snapshot and the log after it."""
+        games = {}
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as source:
+                snapshot = json.load(source)
+            self.generation = snapshot["generation"]
+            games = {id: Game.from_json(game) for id, game in snapshot["games"].items()}
+
+        log_path = self.log_path(self.generation)
+
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as source:
+                lines = source.read().split("\n")
+
+            # A crash can leave the last record unfinished, which is dropped.
+            for line in lines[:-1]:
+                self.replay(games, json.loads(line))
+                self.records += 1
+
+            if lines[-1]:
+                with open(log_path, "rb+") as source:
+                    source.truncate(sum(len(i.encode()) + 1 for i in lines[:-1]))
+
+        self.file = open(log_path, "a", encoding="utf-8")
+        return games
+
+    @staticmethod
+    def replay(games: Dict[str, Game], record: dict) -> None:
+        id = record["game"]
+
+        if "created" in record:
+            games[id] = Game.from_json(record["created"])
+        elif "event" in record:
+            games[id].apply_event(record["event"])
+        elif record.get("deleted"):
+            games.pop(id, None)
+
+    def append(self, record: dict) -> None:
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+        self.records += 1
+
+    def created(self, id: str, game: Game) -> None:
+        self.append({"game": id, "created": game.json()})
+
+    def events(self, id: str, events: List[dict]) -> None:
+        for event in events:
+            self.append({"game": id, "event": event})
+
+    def deleted(self, id: str) -> None:
+        self.append({"game": id, "deleted": True})
+
+    def snapshot_due(self) -> bool:
+        return self.records >= self.snapshot_interval
+
+    def snapshot(self, games: Dict[str, Game]) -> None:
+        """Save every game and start a new log.
+
+        The snapshot names the log that follows it and replaces the old one
+        in a single rename, so a crash at any point leaves either the old
+        snapshot and log or the new ones.
+        """
+        generation = self.generation + 1
+        open(self.log_path(generation), "a", encoding="utf-8").close()
+
+        temporary_path = self.snapshot_path + ".tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as output:
+            json.dump(
+                {
+                    "generation": generation,
+                    "games": {id: game.json() for id, game in games.items()},
+                },
+                output,
+            )
+            output.flush()
+            os.fsync(output.fileno())
+
+        os.replace(temporary_path, self.snapshot_path)
+
+        self.file.close()
+        self.file = open(self.log_path(generation), "a", encoding="utf-8")
+        self.generation = generation
+        self.records = 0
+
+        for path in glob.glob(os.path.join(self.directory, "events.*.log")):
+            if path != self.log_path(generation):
+                os.remove(path)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
@@ -1,3 +1,4 @@
+import secrets
 from enum import Enum
 from typing import List, Optional
 
@@ -5,13 +6,16 @@ from online_scrabble.core.bag import Bag
 from online_scrabble.core.grid import Grid
 from online_scrabble.core.placement import Placement, ScoredPlacement
 from online_scrabble.core.player import Player
-from online_scrabble.core.solution_builder import SolutionBuilder
-from online_scrabble.core.rack import populate_rack, remove_letters_from_rack
+from online_scrabble.core.solution_builder import PlacementError, SolutionBuilder
+from online_scrabble.core.rack import RACK_LENGTH, remove_letters_from_rack
 from online_scrabble.core.trie import Trie
 
 
 MAX_PLAYERS = 4
 
+# Event fields anyone may see; the rest (racks and drawn letters) are private.
+PUBLIC_EVENT_FIELDS = ("type", "player", "placement")
+
 
 class GameError(Exception):
     pass
@@ -47,6 +51,8 @@ class Game:
         state: GameState,
         turn: Optional[str],
         previous_placement: Optional[PreviousPlacement],
+        events: Optional[List[dict]] = None,
+        nonce: Optional[str] = None,
     ):
         self.bag = bag
         self.grid = grid
@@ -55,6 +61,45 @@ class Game:
         self.turn = turn
         self.previous_placement = previous_placement
 
+        # Every change made to the game, oldest first, see `apply_event`.
+        self.events = events or []
+
+        # Tells this game apart from earlier ones with the same id, which
+        # may have reached the same version.
+        self.nonce = nonce or secrets.token_hex(4)
+
+    @property
+    def version(self) -> int:
+        """Increases with every change to the game."""
+        return len(self.events)
+
+    @property
+    def tag(self) -> str:
+        """The version of this very game, as given to clients."""
+        return f"{self.nonce}-{self.version}"
+
+    def version_of(self, tag: str) -> Optional[int]:
+        """The version `tag` names, or None if this game never had it."""
+        nonce, _, version = tag.rpartition("-")
+
+        if nonce != self.nonce or not version.isdigit():
+            return None
+
+        if int(version) > self.version:
+            return None
+
+        return int(version)
+
+    def public_events(self, since: int) -> List[dict]:
+        """The events after version `since`, each with the version it made."""
+        return [
+            {
+                "version": version,
+                **{i: event[i] for i in PUBLIC_EVENT_FIELDS if i in event},
+            }
+            for version, event in enumerate(self.events[since:], since + 1)
+        ]
+
     def current_player(self) -> Optional[Player]:
         if self.turn is None:
             return None
@@ -70,6 +115,8 @@ class Game:
             "turn": self.turn,
             "previous_placement": self.previous_placement
             and self.previous_placement.json(),
+            "events": self.events,
+            "nonce": self.nonce,
         }
 
     def join(self, player_name: str) -> Player:
@@ -82,11 +129,10 @@ class Game:
         if player_name in (i.name for i in self.players):
             raise GameError("You already joined this game.")
 
-        new_player = Player(player_name, populate_rack("", self.bag), 0)
-
-        self.players += [new_player]
+        rack = "".join(self.bag.sample(RACK_LENGTH))
+        self.apply_event({"type": "join", "player": player_name, "rack": rack})
 
-        return new_player
+        return self.players[-1]
 
     def start(self, player_name: str) -> Player:
         if player_name not in (i.name for i in self.players):
@@ -95,8 +141,7 @@ class Game:
         if self.state != GameState.WAITING_TO_START:
             raise GameError("The game is in progress.")
 
-        self.state = GameState.IN_PROGRESS
-        self.turn = self.players[0].name
+        self.apply_event({"type": "start", "player": player_name})
 
     def get_player(self, player_name: str) -> Player:
         player = next((i for i in self.players if i.name == player_name), None)
@@ -124,20 +169,13 @@ class Game:
     def score_placement(
         self, player_name: str, placemnt: Placement, trie: Trie
     ) -> ScoredPlacement:
-        grid_copy = self.grid.copy()
-        grid_copy.reset_crosscheck()
-
-        solution_builder = SolutionBuilder(grid_copy, trie)
+        solution_builder = SolutionBuilder(self.grid, trie)
         player = self.get_player(player_name)
 
-        valid_placements = solution_builder.solve(player.rack)
-
-        expression = (i for i in valid_placements if i == placemnt)
-
         try:
-            return next(expression)
-        except StopIteration as exception:
-            raise GameError("Invalid placement.") from exception
+            return solution_builder.validate(player.rack, placemnt)
+        except PlacementError as exception:
+            raise GameError(str(exception)) from exception
 
     def insert(self, player_name: str, placement: Placement, trie: Trie) -> None:
         if player_name != self.turn:
@@ -149,24 +187,84 @@ class Game:
         scored_placement = self.score_placement(player_name, placement, trie)
 
         player = self.get_player(player_name)
+        rack = remove_letters_from_rack(player.rack, placement.letters)
+        drawn = "".join(self.bag.sample(RACK_LENGTH - len(rack)))
+
+        self.apply_event(
+            {
+                "type": "placement",
+                "player": player_name,
+                "placement": scored_placement.json(),
+                "drawn": drawn,
+            }
+        )
 
-        player.rack = remove_letters_from_rack(rack, placement.letters)
-        player.rack = populate_rack(player.rack, self.bag)
-
-        player.score += scored_placement.score
-
-        self.grid.insert(scored_placement)
-        self.turn = self.get_next_player().name
-
-        self.previous_placement = PreviousPlacement(scored_placement, player_name)
-
-        if len(player.rack) == 0:
-            self.end_game()
+    def apply_event(self, event: dict) -> None:
+        """Make the change `event` records and add it to `events`.
+
+        Events carry the letters drawn from the bag, so applying the events
+        of a game to the game they started from reproduces it exactly.
+        """
+        if event["type"] == "join":
+            self.bag.remove_characters(event["rack"])
+            self.players += [Player(event["player"], event["rack"], 0)]
+        elif event["type"] == "start":
+            self.state = GameState.IN_PROGRESS
+            self.turn = self.players[0].name
+        elif event["type"] == "placement":
+            placement = ScoredPlacement.from_json(event["placement"])
+            player = self.get_player(event["player"])
+
+            player.rack = remove_letters_from_rack(player.rack, placement.letters)
+            player.rack += event["drawn"]
+            self.bag.remove_characters(event["drawn"])
+
+            player.score += placement.score
+
+            self.grid.insert(placement)
+            self.turn = self.get_next_player().name
+
+            self.previous_placement = PreviousPlacement(placement, player.name)
+
+            if len(player.rack) == 0:
+                self.end_game()
+        else:
+            raise GameError(f"Unknown event {event['type']!r}.")
+
+        self.events += [event]
+
+    def copy(self):
+        """A copy that can be changed without changing this game."""
+        return Game(
+            Bag(self.bag.content.copy(), self.bag.rng),
+            self.grid.copy(),
+            [Player(i.name, i.rack, i.score) for i in self.players],
+            self.state,
+            self.turn,
+            self.previous_placement,
+            self.events.copy(),
+            self.nonce,
+        )
 
     def end_game(self):
         self.state = GameState.COMPLETED
         self.turn = max(self.players, key=lambda i: i.score).name
 
+    @staticmethod
+    def from_json(json_data: dict):
+        previous_placement = json_data["previous_placement"]
+
+        return Game(
+            Bag.from_json(json_data["bag"]),
+            Grid.from_json(json_data["grid"]),
+            [Player.from_json(i) for i in json_data["players"]],
+            GameState(json_data["state"]),
+            json_data["turn"],
+            previous_placement and PreviousPlacement.from_json(previous_placement),
+            json_data.get("events", []),
+            json_data.get("nonce"),
+        )
+
     @staticmethod
     def new():
         bag = Bag.new()
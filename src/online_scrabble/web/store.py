@@ -0,0 +1,282 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from online_scrabble.web.event_log import EventLog
+from online_scrabble.web.game import Game
+
+T = TypeVar("T")
+
+MAX_RETRIES = 10
+
+
+class StoreError(Exception):
+    pass
+
+
+class GameStore(ABC):
+    """Where the server keeps its games.
+
+    Changes go through `update`, which applies a function to the current
+    game and saves the result, so that stores shared between processes can
+    detect conflicting writes. The change is made to a copy of the game,
+    which replaces it once saved, so the games returned by `get` are never
+    changed and can be read by any number of requests at once. Readers must
+    not change them either: solving fills in caches on the grid, which is
+    why `SolveCache` solves on a copy of it.
+
+    Every change made through the store wakes the requests waiting in
+    `wait`. Stores that other processes can change also look for changes
+    every `poll_interval` seconds while waiting.
+    """
+
+    poll_interval: Optional[float] = None
+
+    def __init__(self):
+        self.changed = threading.Condition()
+
+    def notify(self) -> None:
+        with self.changed:
+            self.changed.notify_all()
+
+    def wait(self, id: str, tag: str, timeout: float) -> Optional[Game]:
+        """Wait until the game is no longer at `tag`, at most `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+
+        with self.changed:
+            while True:
+                game = self.get(id)
+                remaining = deadline - time.monotonic()
+
+                if game is None or game.tag != tag or remaining <= 0:
+                    return game
+
+                if self.poll_interval is not None:
+                    remaining = min(remaining, self.poll_interval)
+
+                self.changed.wait(remaining)
+
+    @abstractmethod
+    def create(self, id: str, game: Game) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, id: str) -> Optional[Game]:
+        pass
+
+    @abstractmethod
+    def update(self, id: str, change: Callable[[Game], T]) -> T:
+        pass
+
+    @abstractmethod
+    def delete(self, id: str) -> None:
+        pass
+
+
+class MemoryGameStore(GameStore):
+    """Games held by this process only.
+
+    With an `EventLog` every change is also written to the log, and the
+    games are recovered from it when the store is created.
+    """
+
+    def __init__(self, event_log: Optional[EventLog] = None):
+        super().__init__()
+        self.event_log = event_log
+        self.games: Dict[str, Game] = event_log.recover() if event_log else {}
+        self.lock = threading.Lock()
+
+    def logged(self) -> None:
+        if self.event_log.snapshot_due():
+            self.event_log.snapshot(self.games)
+
+    def create(self, id: str, game: Game) -> None:
+        with self.lock:
+            if id in self.games:
+                raise StoreError("Game already exists.")
+            self.games[id] = game
+
+            if self.event_log:
+                self.event_log.created(id, game)
+                self.logged()
+
+        self.notify()
+
+    def get(self, id: str) -> Optional[Game]:
+        return self.games.get(id)
+
+    def update(self, id: str, change: Callable[[Game], T]) -> T:
+        with self.lock:
+            current = self.games.get(id)
+
+            if current is None:
+                raise StoreError("This game does not exist.")
+
+            game = current.copy()
+            result = change(game)
+            self.games[id] = game
+
+            if self.event_log:
+                self.event_log.events(id, game.events[len(current.events) :])
+                self.logged()
+
+        self.notify()
+        return result
+
+    def delete(self, id: str) -> None:
+        with self.lock:
+            if self.games.pop(id, None) and self.event_log:
+                self.event_log.deleted(id)
+                self.logged()
+
+        self.notify()
+
+
+class SqliteGameStore(GameStore):
+    """Games in a SQLite database that several processes can share.
+
+    Every row has a version that each write increments. A write only
+    succeeds if the version is still the one that was read, otherwise the
+    change is retried on the newer game. The last `max_cached` games read
+    by this process are cached with their version, so reading a game that
+    has not changed costs one small query rather than decoding it.
+
+    The copy that `update` changes is decoded from the row it read, and is
+    only cached once it is saved.
+    """
+
+    poll_interval = 1.0
+
+    def __init__(self, path: str, max_cached: int = 1024):
+        super().__init__()
+        self.path = path
+        self.max_cached = max_cached
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.update_lock = threading.Lock()
+        self.cache = OrderedDict()
+
+        with self.connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS games "
+                "(id TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+
+        return connection
+
+    def cached(self, id: str, version: int) -> Optional[Game]:
+        with self.lock:
+            entry = self.cache.get(id)
+
+            if entry is None or entry[0] != version:
+                return None
+
+            self.cache.move_to_end(id)
+            return entry[1]
+
+    def publish(self, id: str, version: int, game: Game) -> None:
+        with self.lock:
+            self.cache[id] = (version, game)
+            self.cache.move_to_end(id)
+
+            while len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+
+    def forget(self, id: str) -> None:
+        with self.lock:
+            self.cache.pop(id, None)
+
+    def load(self, id: str) -> Optional[Tuple[int, Game]]:
+        connection = self.connection()
+        row = connection.execute(
+            "SELECT version FROM games WHERE id = ?", (id,)
+        ).fetchone()
+
+        if row is not None:
+            game = self.cached(id, row[0])
+
+            if game is not None:
+                return row[0], game
+
+        row = connection.execute(
+            "SELECT version, data FROM games WHERE id = ?", (id,)
+        ).fetchone()
+
+        if row is None:
+            self.forget(id)
+            return None
+
+        game = Game.from_json(json.loads(row[1]))
+        self.publish(id, row[0], game)
+        return row[0], game
+
+    def create(self, id: str, game: Game) -> None:
+        try:
+            with self.connection() as connection:
+                connection.execute(
+                    "INSERT INTO games (id, version, data) VALUES (?, 1, ?)",
+                    (id, json.dumps(game.json())),
+                )
+        except sqlite3.IntegrityError as error:
+            raise StoreError("Game already exists.") from error
+
+        self.publish(id, 1, game)
+        self.notify()
+
+    def get(self, id: str) -> Optional[Game]:
+        entry = self.load(id)
+        return entry and entry[1]
+
+    def update(self, id: str, change: Callable[[Game], T]) -> T:
+        with self.update_lock:
+            result = self.update_with_retries(id, change)
+
+        self.notify()
+        return result
+
+    def update_with_retries(self, id: str, change: Callable[[Game], T]) -> T:
+        connection = self.connection()
+
+        for _ in range(MAX_RETRIES):
+            row = connection.execute(
+                "SELECT version, data FROM games WHERE id = ?", (id,)
+            ).fetchone()
+
+            if row is None:
+                raise StoreError("This game does not exist.")
+
+            version = row[0]
+            game = Game.from_json(json.loads(row[1]))
+            result = change(game)
+
+            with connection:
+                cursor = connection.execute(
+                    "UPDATE games SET version = ?, data = ? "
+                    "WHERE id = ? AND version = ?",
+                    (version + 1, json.dumps(game.json()), id, version),
+                )
+
+            if cursor.rowcount == 1:
+                self.publish(id, version + 1, game)
+                return result
+
+        raise StoreError("The game is too busy, try again.")
+
+    def delete(self, id: str) -> None:
+        with self.connection() as connection:
+            connection.execute("DELETE FROM games WHERE id = ?", (id,))
+
+        self.forget(id)
+        self.notify()
@@ -1,10 +1,39 @@
 # pylint: disable=redefined-outer-name
+import json
 import random
 
 import pytest
 
-from online_scrabble.core import Bag, Character, Grid, Placement, Trie, SolutionBuilder
+from online_scrabble.core import (
+    ArrayGrid,
+    Bag,
+    build_gaddag,
+    Character,
+    Dawg,
+    DawgError,
+    Grid,
+    GridSnapshot,
+    ParallelSolver,
+    Placement,
+    PlacementError,
+    SolutionBuilder,
+    SolveCache,
+    SolverStats,
+    Trie,
+)
+from online_scrabble.benchmark.positions import (
+    load_positions,
+    parse_move,
+    POSITIONS_PATH,
+)
+from online_scrabble.core.anchor import calculate_anchors
+from online_scrabble.core.grid import letter_bit
 from online_scrabble.core.rack import populate_rack, remove_letters_from_rack
+from online_scrabble.core.zobrist import position_hash, rack_hash
+from online_scrabble.bot.fleet import assign_games, count_players
+from online_scrabble.bot.strategy import MonteCarloStrategy, unseen_tiles
+from online_scrabble.simulator.game import play_game
+from online_scrabble.simulator.run import summarise
 
 
 @pytest.fixture
@@ -22,6 +51,17 @@ def trie():
     return Trie.load("dictionary.txt")
 
 
+@pytest.fixture(scope="module")
+def dawg():
+    return Dawg.load("dictionary.txt")
+
+
+@pytest.fixture(scope="module")
+def short_words():
+    with open("dictionary.txt", encoding="utf-8") as dictionary:
+        return [i.rstrip("\n") for i in dictionary if len(i) <= 7]
+
+
 @pytest.fixture
 def solution_builder(grid, trie):
     return SolutionBuilder(grid, trie)
@@ -35,11 +75,421 @@ def test_trie_no_substring(trie):
     assert trie.contains("avoc") is False
 
 
+def test_dawg_has_word(dawg):
+    assert dawg.contains("avocado") is True
+    assert dawg.contains("avoc") is False
+    assert dawg.find("avoc").children.keys() == {"A", "E"}
+
+
+def test_dawg_shares_suffixes(dawg):
+    # A plain trie over this dictionary needs almost 400,000 nodes.
+    assert len(dawg) < 100000
+
+
+def test_dawg_file_round_trip(dawg, tmp_path):
+    path = str(tmp_path / "dictionary.dawg")
+    dawg.save(path)
+
+    mapped = Dawg.open(path)
+
+    assert len(mapped) == len(dawg)
+    assert mapped.contains("avocado") is True
+    assert mapped.contains("avoc") is False
+    assert mapped.find("avoc").children.keys() == {"A", "E"}
+
+
+def test_dawg_file_rejects_other_versions(dawg, tmp_path):
+    path = tmp_path / "dictionary.dawg"
+    dawg.save(str(path))
+
+    data = bytearray(path.read_bytes())
+    data[8] += 1
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(DawgError):
+        Dawg.open(str(path))
+
+
+def test_dawg_matches_trie_solutions(grid, trie, dawg):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+
+    trie_placements = SolutionBuilder(grid, trie).solve("RETAINS")
+    dawg_placements = SolutionBuilder(grid, dawg).solve("RETAINS")
+
+    assert [i.json() for i in dawg_placements] == [i.json() for i in trie_placements]
+
+
+def test_cross_checks_follow_inserts(grid, dawg):
+    grid.prepare_cross_checks(dawg)
+
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    grid.insert(Placement(9, 5, False, Character.from_string("MOKEY")))
+
+    fresh = Grid.from_json(grid.json())
+    fresh.prepare_cross_checks(dawg)
+
+    assert grid.horizontal_masks == fresh.horizontal_masks
+    assert grid.vertical_masks == fresh.vertical_masks
+
+    # Only "S" extends MONKEY, and nothing can sit under the first M.
+    assert grid.cross_check_mask(13, 7, False) == letter_bit("S")
+    assert grid.cross_check_mask(7, 8, True) & letter_bit("S") == 0
+
+
+def test_anchors_follow_inserts(grid, dawg):
+    def anchor_keys(anchors):
+        return [
+            (i.x, i.y, i.x_length, i.y_length, i.x_trie.index, i.y_trie.index)
+            for i in anchors
+        ]
+
+    random.seed(2)
+    bag = Bag.new()
+    rack = ""
+
+    for _ in range(12):
+        rack = populate_rack(rack, bag)
+        anchors = calculate_anchors(grid, dawg)
+        fresh_anchors = calculate_anchors(Grid.from_json(grid.json()), dawg)
+
+        assert anchor_keys(anchors) == anchor_keys(fresh_anchors)
+
+        placements = SolutionBuilder(grid, dawg).solve(rack, best_only=True)
+        if not placements:
+            break
+        grid.insert(placements[-1])
+        rack = remove_letters_from_rack(rack, placements[-1].letters)
+
+
+def test_score_move_matches_score(grid, dawg):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    grid.insert(Placement(9, 5, False, Character.from_string("MOKEY")))
+
+    solution_builder = SolutionBuilder(grid, dawg)
+    placements = solution_builder.solve("RATES E")
+
+    for placement in placements[::25]:
+        grid_copy = grid.copy()
+        grid_copy.insert(placement)
+
+        score = solution_builder.score(
+            grid_copy, placement.x, placement.y, placement.horizontal
+        )
+
+        assert placement.score == score
+
+
+def test_validate_matches_solve(grid, dawg):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    grid.insert(Placement(9, 5, False, Character.from_string("MOKEY")))
+
+    solution_builder = SolutionBuilder(grid, dawg)
+    placements = solution_builder.solve("RATES E")
+
+    for placement in placements[::25]:
+        assert solution_builder.validate("RATES E", placement).score == placement.score
+
+
+@pytest.mark.parametrize(
+    "placement",
+    [
+        Placement(7, 6, True, Character.from_string("ZZ")),
+        Placement(0, 0, True, Character.from_string("AT")),
+        Placement(7, 7, True, Character.from_string("AT")),
+        Placement(6, 8, True, Character.from_string("SAT")),
+        Placement(13, 7, True, Character.from_string("SEAT")),
+    ],
+)
+def test_validate_rejects(grid, dawg, placement):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+
+    with pytest.raises(PlacementError):
+        SolutionBuilder(grid, dawg).validate("SEAT", placement)
+
+
+def test_gaddag_matches_two_phase_engine(grid, short_words):
+    dawg = Dawg.build(short_words)
+    gaddag = build_gaddag(short_words)
+
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    grid.insert(Placement(9, 5, False, Character.from_string("MOKEY")))
+    grid.insert(Placement(10, 14, True, Character.from_string("TEA")))
+    grid.insert(Placement(14, 8, False, Character.from_string("OAT")))
+
+    for rack in ("RATESIN", "RATES E", "QUA  "):
+        expected = SolutionBuilder(grid, dawg).solve(rack)
+        placements = SolutionBuilder(grid, dawg, gaddag).solve(rack)
+
+        assert sorted(str(i.json()) for i in placements) == sorted(
+            str(i.json()) for i in expected
+        )
+
+
+def test_parallel_solve_matches_solve(grid, short_words, tmp_path):
+    dawg = Dawg.build(short_words)
+    gaddag = build_gaddag(short_words)
+    dawg.save(tmp_path / "words.dawg")
+    gaddag.save(tmp_path / "words.gaddag")
+
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+
+    expected = SolutionBuilder(grid, dawg).solve("RATES E")
+
+    with ParallelSolver(
+        tmp_path / "words.dawg", tmp_path / "words.gaddag", max_workers=2
+    ) as solver:
+        placements = solver.solve(grid, "RATES E")
+        top_placements = solver.solve(grid, "RATES E", top_k=10)
+        # More than there are moves, but fewer than twice as many.
+        all_placements = solver.solve(grid, "RATES E", top_k=len(expected) + 1)
+        no_placements = solver.solve(grid, "RATES E", top_k=0)
+
+    assert sorted(str(i.json()) for i in placements) == sorted(
+        str(i.json()) for i in expected
+    )
+    assert [i.score for i in top_placements] == [i.score for i in expected[-10:]]
+    assert sorted(str(i.json()) for i in all_placements) == sorted(
+        str(i.json()) for i in expected
+    )
+    assert len(no_placements) == 0
+
+
+def test_solver_stats(grid, short_words):
+    dawg = Dawg.build(short_words)
+    gaddag = build_gaddag(short_words)
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+
+    for engine in (None, gaddag):
+        stats = SolverStats()
+        placements = SolutionBuilder(grid, dawg, engine, stats).solve("RATES E")
+
+        assert stats.solves == 1
+        assert stats.moves == len(placements)
+        assert stats.anchors == len(calculate_anchors(grid, dawg))
+        assert stats.nodes > stats.moves
+        assert 0 < stats.cross_check_rejections < stats.cross_checks
+        assert min(stats.anchor_time, stats.search_time, stats.scoring_time) > 0
+        assert set(stats.json()) >= {"nodes", "moves", "sorting_time"}
+
+
 def test_starting_move(solution_builder):
     placements = solution_builder.solve("AVOCADO")
     assert placements[-1].score == 65
 
 
+def test_top_k_moves(grid, dawg):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+
+    placements = SolutionBuilder(grid, dawg).solve("RATES E")
+    top_placements = SolutionBuilder(grid, dawg).solve("RATES E", top_k=10)
+    best_placements = SolutionBuilder(grid, dawg).solve("RATES E", best_only=True)
+
+    expected = [i.json() for i in placements[-10:]]
+
+    assert [i.json() for i in top_placements] == expected
+    assert [i.json() for i in best_placements] == expected[-1:]
+
+
+def test_moves_stop_at_the_board_edge(grid, dawg):
+    grid.insert(Placement(10, 14, True, Character.from_string("TEA")))
+
+    placements = [i.json() for i in SolutionBuilder(grid, dawg).solve("RATES E")]
+
+    # TEASE fills the last row to the corner, which the edge check stopped.
+    assert Placement(13, 14, True, Character.from_string("SE")).json() in [
+        {key: i[key] for key in ("x", "y", "horizontal", "letters")} for i in placements
+    ]
+
+
+def test_array_grid_matches_grid(grid, dawg):
+    array_grid = ArrayGrid.large()
+
+    for placement in (
+        Placement(7, 7, True, Character.from_string("MONKEY")),
+        Placement(9, 5, False, [Character("M", False), Character("O", True)]),
+        Placement(10, 14, True, Character.from_string("TEA")),
+    ):
+        grid.insert(placement)
+        array_grid.insert(placement)
+
+    copy = array_grid.copy()
+    copy.insert(Placement(14, 8, False, Character.from_string("OAT")))
+
+    assert array_grid.json() == grid.json()
+    assert ArrayGrid.from_json(grid.json()).json() == grid.json()
+    assert copy.json() != grid.json()
+    for x, y, horizontal in ((11, 7, True), (9, 6, False), (10, 14, False)):
+        assert array_grid.get_word(x, y, horizontal) == grid.get_word(x, y, horizontal)
+
+    expected = SolutionBuilder(grid, dawg).solve("RATES E")
+    placements = SolutionBuilder(array_grid, dawg).solve("RATES E")
+
+    assert [i.json() for i in placements] == [i.json() for i in expected]
+
+
+def test_grid_snapshots_share_rows(grid, dawg):
+    snapshot = GridSnapshot.from_grid(grid)
+
+    for placement in (
+        Placement(7, 7, True, Character.from_string("MONKEY")),
+        Placement(9, 5, False, Character.from_string("MOKEY")),
+    ):
+        parent = snapshot
+        snapshot = snapshot.with_placement(placement)
+        grid.insert(placement)
+
+        assert snapshot.json() == grid.json()
+        assert GridSnapshot.from_grid(grid) == snapshot
+
+    assert parent.letter(9, 8) is None
+    assert snapshot.letter(9, 8) == "K"
+    assert snapshot.rows[0] is parent.rows[0]
+    assert snapshot.rows[7] is parent.rows[7]
+    assert snapshot.types is parent.types
+
+    # `MonteCarloStrategy` solves on boards built from snapshots.
+    assert [
+        i.json() for i in SolutionBuilder(snapshot.to_grid(), dawg).solve("QUIET S")
+    ] == [i.json() for i in SolutionBuilder(grid, dawg).solve("QUIET S")]
+
+
+def test_zobrist_hash_follows_inserts(grid):
+    empty_hash = grid.zobrist
+    array_grid = ArrayGrid.large()
+
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    array_grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    copy = grid.copy()
+    copy.insert(Placement(9, 5, False, [Character("M", False), Character("O", True)]))
+
+    assert grid.zobrist != empty_hash
+    assert grid.zobrist == Grid.from_json(grid.json()).zobrist
+    assert grid.zobrist == array_grid.zobrist
+    assert copy.zobrist == Grid.from_json(copy.json()).zobrist
+    assert copy.zobrist != grid.zobrist
+
+    assert rack_hash("RATES E") == rack_hash("E ESART")
+    assert rack_hash("RATES E") != rack_hash("RATESEE")
+    assert position_hash(grid, "AB") != position_hash(copy, "AB")
+
+
+def test_solve_cache(grid, dawg):
+    solve_cache = SolveCache(dawg, max_entries=2)
+
+    placements = solve_cache.solve(grid, "RATES E", top_k=3)
+
+    assert solve_cache.solve(grid, "E SRATE", top_k=3) is placements
+    assert solve_cache.solve(Grid.from_json(grid.json()), "RATES E", top_k=3) is (
+        placements
+    )
+    assert (solve_cache.hits, solve_cache.misses) == (2, 1)
+
+    grid.insert(placements[-1])
+    after_insert = solve_cache.solve(grid, "RATES E", top_k=3)
+
+    assert after_insert is not placements
+    assert [i.json() for i in after_insert] == [
+        i.json() for i in SolutionBuilder(grid, dawg).solve("RATES E", top_k=3)
+    ]
+
+    solve_cache.solve(grid, "QUIZ", top_k=3)
+
+    assert len(solve_cache) == 2
+    assert solve_cache.solve(Grid.large(), "RATES E", top_k=3) is not placements
+
+    solve_cache.discard(grid.zobrist)
+
+    assert len(solve_cache) == 1
+    assert solve_cache.size > 0
+
+    # Empty boards all have the same Zobrist hash.
+    solve_cache = SolveCache(dawg)
+    empty = Grid.empty(15, 15)
+    assert solve_cache.solve(empty, "RATES E") is not solve_cache.solve(
+        Grid.large(), "RATES E"
+    )
+    assert solve_cache.solve(empty, "RATES E") is not solve_cache.solve(
+        Grid.empty(11, 11), "RATES E"
+    )
+    assert empty.lexicon is None and empty.anchors is None
+
+
+def test_benchmark_positions_are_legal(dawg):
+    with open(POSITIONS_PATH, encoding="utf-8") as source:
+        moves = {i["name"]: i["moves"] for i in json.load(source)}
+
+    for position in load_positions():
+        grid = Grid.large()
+
+        for move in map(parse_move, moves[position.name]):
+            rack = "".join(" " if i.wild else i.value for i in move.letters)
+            grid.insert(SolutionBuilder(grid, dawg).validate(rack, move))
+
+        assert grid.json() == position.grid.json()
+        assert len(position.rack) == 7
+
+
+def test_simulated_games_are_seeded(dawg):
+    assert Bag.new(random.Random(1)).sample(7) == Bag.new(random.Random(1)).sample(7)
+
+    first = play_game(1, dawg)
+    again = play_game(1, dawg)
+
+    assert first.scores == again.scores
+    assert first.moves == again.moves > 0
+    assert len(first.solve_times) == first.moves + first.passes
+    assert play_game(2, dawg).scores != first.scores
+
+    summary = summarise([first], 1.0)
+
+    assert summary["moves_per_game"] == first.moves
+    assert summary["score"]["max"] == max(first.scores)
+    assert summarise([], 0.0)["games_per_second"] == 0
+
+
+def test_monte_carlo_strategy(dawg, grid):
+    grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
+    unseen = unseen_tiles(grid, "QUIET S")
+
+    assert len(unseen) == len(Bag.new().content) - 6 - 7
+    assert unseen.count("E") == 12 - 2
+    assert unseen.count(" ") == 2 - 1
+
+    best = SolutionBuilder(grid, dawg).solve("QUIET S", best_only=True)[-1]
+    candidates = SolutionBuilder(grid, dawg).solve("QUIET S", top_k=3)
+
+    chosen = MonteCarloStrategy(dawg, budget=0).choose(grid, "QUIET S")
+    assert chosen.json() == best.json()
+
+    strategy = MonteCarloStrategy(dawg, 3, budget=0.2, rng=random.Random(1))
+    chosen = strategy.choose(grid, "QUIET S")
+    assert chosen.json() in [i.json() for i in candidates]
+    assert strategy.choose(Grid.large(), "") is None
+
+
+def test_assign_games():
+    config = {"bot_count": 5, "games": ["one", "two"], "players_per_game": 3}
+    assignment = assign_games(config)
+
+    assert assignment == {
+        "house-1": ["one", "two"],
+        "house-2": ["one"],
+        "house-3": ["one"],
+        "house-4": ["two"],
+        "house-5": ["two"],
+    }
+    assert count_players(assignment) == {"one": 3, "two": 3}
+
+    # Too few bots to fill a game, so it starts with every bot there is.
+    small = assign_games({"bot_count": 2, "games": ["one"], "players_per_game": 3})
+
+    assert count_players(small) == {"one": 2}
+
+    named = assign_games({"bots": {"a": ["one", "two"], "b": ["one"]}})
+
+    assert count_players(named) == {"one": 2, "two": 1}
+
+
 def test_grid_placement_and_fetching(grid):
     grid.insert(Placement(7, 7, True, Character.from_string("MONKEY")))
     grid.insert(Placement(9, 5, False, Character.from_string("MOKEY")))
@@ -1,7 +1,34 @@
 # pylint: disable=redefined-outer-name
+import asyncio
+import json
+import random
+import threading
+import time
+from base64 import b64encode
+
 import pytest
+from werkzeug.serving import make_server
 
+from online_scrabble.bot.async_bot import AsyncScrabbleBot
+from online_scrabble.bot.bot import BotError, GameState
+from online_scrabble.bot.stats import BotStats
+from online_scrabble.core import (
+    Character,
+    Grid,
+    Placement,
+    ScoredPlacement,
+    SolutionBuilder,
+    SolveCache,
+)
 from online_scrabble.web import __main__ as main
+from online_scrabble.web.event_log import EventLog
+from online_scrabble.web.game import Game, GameError
+from online_scrabble.web.store import (
+    GameStore,
+    MemoryGameStore,
+    SqliteGameStore,
+    StoreError,
+)
 
 
 @pytest.fixture
@@ -9,12 +36,401 @@ def app():
     return main.app.test_client()
 
 
+@pytest.fixture(params=["memory", "sqlite"])
+def game_store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryGameStore()
+    return SqliteGameStore(str(tmp_path / "games.db"))
+
+
 @pytest.fixture
 def grid():
     return Grid.large()
 
 
+@pytest.fixture
+def server():
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}"
+
+    server.shutdown()
+    thread.join()
+
+
 def test_app(app):
     response = app.get("/")
     assert b"<title>Online Scrabble</title>" in response.data
     assert 200 == response.status_code
+
+
+def auth(name: str) -> dict:
+    return {"Authorization": b64encode(f"{name}:".encode("utf-8")).decode("utf-8")}
+
+
+def test_hint(app):
+    assert app.post("/game/hint", headers=auth("alice")).status_code == 200
+    app.put("/game/hint/join", headers=auth("alice"))
+    app.put("/game/hint/join", headers=auth("bob"))
+    app.put("/game/hint/start", headers=auth("alice"))
+
+    game = main.game_store.get("hint")
+    game.get_player("alice").rack = "MONKEYS"
+    hits = main.solve_cache.hits
+
+    response = app.put("/game/hint/hint", headers=auth("alice"))
+    again = app.put("/game/hint/hint", headers=auth("alice"))
+
+    assert response.status_code == 200
+    assert len(response.json) == main.HINT_COUNT
+    assert response.json[0]["score"] >= response.json[-1]["score"]
+    assert again.json == response.json
+    assert main.solve_cache.hits == hits + 1
+    assert game.grid.lexicon is None
+
+    assert app.put("/game/hint/hint", headers=auth("carol")).status_code == 400
+
+
+def test_get_game_etag(app):
+    app.post("/game/etag", headers=auth("alice"))
+
+    response = app.get("/game/etag")
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert response.json["state"] == "waiting_to_start"
+
+    unchanged = app.get("/game/etag", headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    app.put("/game/etag/join", headers=auth("alice"))
+    changed = app.get("/game/etag", headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [i["name"] for i in changed.json["players"]] == ["alice"]
+
+
+def test_game_insert():
+    game = Game.new()
+    game.join("alice")
+    game.join("bob")
+    game.start("alice")
+
+    game.get_player("alice").rack = "MONKEYS"
+
+    with pytest.raises(GameError):
+        game.insert(
+            "alice",
+            Placement(0, 0, True, Character.from_string("MONKEY")),
+            main.dictionary,
+        )
+
+    game.insert(
+        "alice", Placement(7, 7, True, Character.from_string("MONKEY")), main.dictionary
+    )
+
+    assert game.grid.get_word(7, 7, True) == "MONKEY"
+    assert game.get_player("alice").score == 32
+    assert len(game.get_player("alice").rack) == 7
+    assert game.turn == "bob"
+
+
+def test_game_store(game_store):
+    game_store.create("game", Game.new())
+
+    with pytest.raises(StoreError):
+        game_store.create("game", Game.new())
+
+    created = game_store.get("game")
+    game_store.update("game", lambda game: game.join("alice"))
+
+    assert not created.players
+
+    with pytest.raises(GameError):
+        game_store.update("game", lambda game: game.join("alice"))
+
+    assert [i.name for i in game_store.get("game").players] == ["alice"]
+
+    game_store.delete("game")
+
+    assert game_store.get("game") is None
+
+    with pytest.raises(StoreError):
+        game_store.update("game", lambda game: game.join("bob"))
+
+    with pytest.raises(TypeError):
+        GameStore()
+
+
+def test_sqlite_game_store_is_shared(tmp_path):
+    path = str(tmp_path / "games.db")
+    first = SqliteGameStore(path)
+    second = SqliteGameStore(path)
+
+    first.create("game", Game.new())
+    second.update("game", lambda game: game.join("alice"))
+
+    game = first.get("game")
+
+    assert [i.name for i in game.players] == ["alice"]
+    assert first.get("game") is game
+    assert game.json() == second.get("game").json()
+
+    calls = []
+
+    def join_bob(game: Game) -> None:
+        # Another worker writes between this read and the write below.
+        if not calls:
+            second.update("game", lambda other: other.join("carol"))
+        calls.append(game)
+        game.join("bob")
+
+    first.update("game", join_bob)
+
+    assert len(calls) == 2
+    assert [i.name for i in second.get("game").players] == ["alice", "carol", "bob"]
+
+
+def test_sqlite_game_store_cache(tmp_path):
+    game_store = SqliteGameStore(str(tmp_path / "games.db"), max_cached=2)
+    game_store.create("game", Game.new())
+    game = game_store.get("game")
+
+    def join_and_fail(other: Game) -> None:
+        other.join("alice")
+        raise GameError("Not saved.")
+
+    with pytest.raises(GameError):
+        game_store.update("game", join_and_fail)
+
+    assert game_store.get("game") is game
+    assert not game.players
+
+    game_store.update("game", lambda other: other.join("bob"))
+
+    assert not game.players
+    assert [i.name for i in game_store.get("game").players] == ["bob"]
+
+    for id in ("second", "third"):
+        game_store.create(id, Game.new())
+
+    assert list(game_store.cache) == ["second", "third"]
+
+
+def play_game(game_store, id: str) -> None:
+    # Racks are drawn at random, seeded so that both players have a move.
+    random.seed(id)
+    game_store.create(id, Game.new())
+    game_store.update(id, lambda game: game.join("alice"))
+    game_store.update(id, lambda game: game.join("bob"))
+    game_store.update(id, lambda game: game.start("alice"))
+
+    for player in ("alice", "bob"):
+        game = game_store.get(id)
+        placement = SolutionBuilder(game.grid, main.dictionary).solve(
+            game.get_player(player).rack, best_only=True
+        )[-1]
+        game_store.update(
+            id,
+            lambda game, player=player, placement=placement: game.insert(
+                player, placement, main.dictionary
+            ),
+        )
+
+
+def test_get_game_events(app):
+    play_game(main.game_store, "events")
+    game = main.game_store.get("events")
+
+    response = app.get("/game/events/events")
+
+    assert response.status_code == 200
+    assert response.json["version"] == game.tag == f"{game.nonce}-5"
+    assert response.json["state"] == "in_progress"
+    assert response.json["turn"] == "alice"
+    assert [i["type"] for i in response.json["events"]] == [
+        "join",
+        "join",
+        "start",
+        "placement",
+        "placement",
+    ]
+    assert all("rack" not in i and "drawn" not in i for i in response.json["events"])
+
+    grid = Grid.large()
+    since = app.get(f"/game/events/events?since={game.nonce}-3").json
+
+    for event in since["events"]:
+        grid.insert(ScoredPlacement.from_json(event["placement"]))
+
+    assert [i["version"] for i in since["events"]] == [4, 5]
+    assert grid.json() == game.grid.json()
+    assert app.get(f"/game/events/events?since={game.tag}").json["events"] == []
+    assert app.get(f"/game/events/events?since={game.nonce}-6").status_code == 400
+    assert app.get("/game/events/events?since=5").status_code == 400
+
+
+def test_recreated_game_versions(app):
+    app.post("/game/recreated", headers=auth("alice"))
+    app.put("/game/recreated/join", headers=auth("alice"))
+    old = app.get("/game/recreated")
+
+    app.delete("/game/recreated", headers=auth("alice"))
+    app.post("/game/recreated", headers=auth("alice"))
+    app.put("/game/recreated/join", headers=auth("bob"))
+    new = app.get("/game/recreated", headers={"If-None-Match": old.headers["ETag"]})
+
+    assert new.status_code == 200
+    assert [i["name"] for i in new.json["players"]] == ["bob"]
+
+    since = old.headers["ETag"].strip('"')
+
+    assert app.get(f"/game/recreated/events?since={since}").status_code == 400
+
+
+def test_stream_game(app):
+    app.post("/game/stream", headers=auth("alice"))
+    app.put("/game/stream/join", headers=auth("alice"))
+
+    timer = threading.Timer(
+        0.2, lambda: app.put("/game/stream/join", headers=auth("bob"))
+    )
+    timer.start()
+
+    game = main.game_store.get("stream")
+    response = app.get(f"/game/stream/stream?since={game.tag}&timeout=10")
+    timer.join()
+
+    assert response.status_code == 200
+    assert response.json["version"] == f"{game.nonce}-2"
+    assert [i["player"] for i in response.json["events"]] == ["bob"]
+
+    since = response.json["version"]
+    unchanged = app.get(f"/game/stream/stream?since={since}&timeout=0.1")
+
+    assert unchanged.json["version"] == since
+    assert unchanged.json["events"] == []
+
+    behind = app.get("/game/stream/stream?timeout=10")
+
+    assert [i["player"] for i in behind.json["events"]] == ["alice", "bob"]
+
+    start = time.monotonic()
+    ahead = app.get(f"/game/stream/stream?since={game.nonce}-3&timeout=10")
+
+    assert ahead.status_code == 400
+    assert time.monotonic() - start < 5
+
+
+def test_game_store_wait(game_store):
+    game = Game.new()
+    game_store.create("wait", game)
+
+    timer = threading.Timer(0.2, game_store.update, ("wait", lambda i: i.join("bob")))
+    timer.start()
+
+    joined = game_store.wait("wait", game.tag, 10)
+
+    assert joined.version == 1
+    assert game_store.wait("wait", joined.tag, 0.1).version == 1
+    assert game_store.wait("missing", game.tag, 10) is None
+
+    timer.join()
+
+
+@pytest.mark.parametrize("snapshot_interval", [1000, 4])
+def test_event_log_recovers_games(tmp_path, snapshot_interval):
+    event_log = EventLog(str(tmp_path), snapshot_interval)
+    game_store = MemoryGameStore(event_log)
+
+    play_game(game_store, "first")
+    play_game(game_store, "second")
+    game_store.delete("second")
+    event_log.close()
+
+    with open(event_log.log_path(event_log.generation), "a", encoding="utf-8") as log:
+        log.write('{"game": "first", "ev')
+
+    recovered = MemoryGameStore(EventLog(str(tmp_path), snapshot_interval))
+
+    assert list(recovered.games) == ["first"]
+    assert recovered.get("first").json() == game_store.get("first").json()
+    assert len(recovered.get("first").events) == 5
+    assert len(list(tmp_path.glob("events.*.log"))) == 1
+
+
+def test_game_events_replay():
+    game = Game.new()
+    start = json.dumps(game.json())
+
+    game.join("alice")
+    game.join("bob")
+    game.start("bob")
+
+    replayed = Game.from_json(json.loads(start))
+
+    for event in game.events:
+        replayed.apply_event(event)
+
+    assert replayed.json() == game.json()
+
+
+def test_async_bot(server):
+    # Racks are drawn at random, seeded so that both players have a move.
+    random.seed("async")
+    stats = BotStats()
+    solve_cache = SolveCache(main.dictionary)
+
+    alice = AsyncScrabbleBot("alice", server, solve_cache, stats=stats)
+    bob = AsyncScrabbleBot("bob", server, solve_cache)
+
+    async def play():
+        async with alice, bob:
+            await alice.create_game("async")
+
+            with pytest.raises(BotError):
+                await alice.create_game("async")
+
+            with pytest.raises(BotError):
+                await alice.join_game("missing")
+
+            for bot in (alice, bob):
+                await bot.join_game("async")
+
+            # Loads the game, then starts it and makes the first move.
+            await alice.work(alice.get_game("async"))
+            assert alice.get_game("async").state is GameState.WaitingToStart
+            await alice.work(alice.get_game("async"))
+
+            await bob.work(bob.get_game("async"))
+
+            for bot in (alice, bob):
+                await bot.fetch_events(bot.get_game("async"))
+
+    asyncio.run(play())
+    game = main.game_store.get("async")
+
+    assert [i["type"] for i in game.public_events(0)] == [
+        "join",
+        "join",
+        "start",
+        "placement",
+        "placement",
+    ]
+
+    for bot in (alice, bob):
+        assert bot.get_game("async").version == game.tag
+        assert bot.get_game("async").grid.json() == game.grid.json()
+        assert bot.get_game("async").rack == list(game.get_player(bot.name).rack)
+
+        with pytest.raises(RuntimeError):
+            bot.executor.submit(print)
+
+    assert stats.moves == 1
+    assert len(stats.solve_times) == 1
+    assert stats.request_times